@@ -1,128 +1,214 @@
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
+import time
+from contextlib import contextmanager
+from llm_client import get_model, stream_in_pool, llm, LLMUnavailable
+from chat_sessions import session_store
+from faq_cache import faq_cache
 from healthutils import get_health_data_summary, get_diabetes_data_summary
+from metrics import LLM_CALL_LATENCY
+
+ERROR_MESSAGE = "I apologize, but I'm unable to process your request at the moment. Please try again later."
+# Returned immediately while the LLM is unavailable (circuit breaker open or overloaded)
+FALLBACK_MESSAGE = "The medical assistant is temporarily unavailable. Please try again in a few minutes."
+
+SYSTEM_PROMPT = (
+    "You are a helpful medical assistant. Provide accurate, cautious, and evidence-based information related to health metrics. "
+    "When asked about specific health metrics, check the provided health data and give clear answers about the values present. "
+    "If a value is not available or null, clearly state that. Always advise consulting healthcare professionals for personalized medical advice."
+)
+SYSTEM_ACK = (
+    "I understand. I will provide information about health metrics from the available data while emphasizing the importance of consulting healthcare professionals for personalized advice."
+)
+CONTEXT_FOOTER = "When asked about specific metrics, reply with the actual values from this data if available."
+
+def _risk_score_text(data):
+    if data['risk_score'] is None:
+        return "Not calculated"
+    return f"{data['risk_score'] * 100:.1f}%"
+
+def _health_context(user_id):
+    """
+    Describe the user's latest health data for the model
+    Returns None if the user has no data
+    """
+    summary = get_health_data_summary(user_id)
+    data = summary['latest'] if summary else None
+    if not data:
+        return None
+
+    return (
+        f"Here is the patient's latest health data:\n"
+        f"- Blood Pressure: {data['blood_pressure'] or 'Not recorded'} mmHg\n"
+        f"- Heart Rate: {data['heart_rate'] or 'Not recorded'} bpm\n"
+        f"- Body Temperature: {data['temperature'] or 'Not recorded'} °C\n"
+        f"- Weight: {data['weight'] or 'Not recorded'} kg\n"
+        f"- Cholesterol: {data['cholesterol'] or 'Not recorded'} mg/dL\n"
+        f"- Risk Score: {_risk_score_text(data)} (represents the probability of developing heart disease)\n"
+        f"- Timestamp: {data['timestamp']}"
+    )
+
+def _diabetes_context(user_id):
+    """
+    Describe the user's latest diabetes data for the model
+    Returns None if the user has no data
+    """
+    summary = get_diabetes_data_summary(user_id)
+    data = summary['latest'] if summary else None
+    if not data:
+        return None
+
+    return (
+        f"Here is the patient's latest health data:\n"
+        f"- Gender: {data['gender'] or 'Not recorded'}\n"
+        f"- Age: {data['age'] or 'Not recorded'} years\n"
+        f"- Hypertension: {data['hypertension'] or 'Not recorded'} (Yes/No)\n"
+        f"- Heart Disease: {data['heart_disease'] or 'Not recorded'} (Yes/No)\n"
+        f"- Smoking History: {data['smoking_history'] or 'Not recorded'} (Yes/No)\n"
+        f"- BMI: {data['bmi'] or 'Not recorded'} kg/m²\n"
+        f"- HbA1c Level: {data['hba1c_level'] or 'Not recorded'} %\n"
+        f"- Blood Glucose Level: {data['blood_glucose_level'] or 'Not recorded'} mg/dL\n"
+        f"- Risk Score/Diabetes Risk: {_risk_score_text(data)} (represents the probability of developing heart disease)\n"
+        f"- Timestamp: {data['timestamp'] or 'Not recorded'}"
+    )
+
+# Chat domain -> patient context builder
+DOMAINS = {
+    'heart': _health_context,
+    'diabetes': _diabetes_context,
+}
 
-# Load environment variables
-load_dotenv()
-
-# Configure the Gemini API
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'),
-                transport="rest",
-                client_options={"api_endpoint": "generativelanguage.googleapis.com"})
+def conversation_history(context, summary=None, turns=()):
+    """
+    Opening history for a chat: the system prompt, the patient context and a
+    summary of older exchanges in one user turn, followed by the model's
+    acknowledgement and the recent exchanges. The history is sent together
+    with the user's message, so a reply is one round trip.
+    """
+    prompt = SYSTEM_PROMPT
+    if context:
+        prompt = f"{prompt}\n\n{context}\n\n{CONTEXT_FOOTER}"
+    if summary:
+        prompt = f"{prompt}\n\nEarlier in this conversation the patient asked: {summary}"
+    return [
+        {"role": "user", "parts": [prompt]},
+        {"role": "model", "parts": [SYSTEM_ACK]},
+        *turns
+    ]
 
-def get_chatbot_response(message, user_id):
+def build_conversation(domain, user_id):
+    """
+    Start a chat for the given domain ('heart' or 'diabetes') primed with the
+    user's data and their recent conversation in that domain
+    """
+    summary, turns = session_store.get(user_id, domain)
+    history = conversation_history(DOMAINS[domain](user_id), summary, turns)
+    return get_model().start_chat(history=history)
+
+def _faq_key(domain, message, user_id):
+    summary, turns = session_store.get(user_id, domain)
+    return faq_cache.key(domain, message, has_history=bool(summary or turns))
+
+def _faq_conversation():
+    # Generic questions are answered without any patient data, so the answer is safe to share
+    return get_model().start_chat(history=conversation_history(None))
+
+@contextmanager
+def _llm_span(domain, mode):
+    """
+    Time one LLM call under LLM_CALL_LATENCY, labelled with how it ended
+    """
+    started = time.perf_counter()
+    outcome = 'error'
     try:
-        # Get health data summary
-        summary = get_health_data_summary(user_id)
-        data = summary['latest'] if summary else None
-
-        # Create a Gemini model instance
-        model = genai.GenerativeModel('gemini-pro')
-
-        # Create a chat instance with the system prompt
-        chat = model.start_chat(history=[
-            {
-                "role": "user",
-                "parts": [
-                    "You are a helpful medical assistant. Provide accurate, cautious, and evidence-based information related to health metrics. "
-                    "When asked about specific health metrics, check the provided health data and give clear answers about the values present. "
-                    "If a value is not available or null, clearly state that. Always advise consulting healthcare professionals for personalized medical advice."
-                ]
-            },
-            {
-                "role": "model",
-                "parts": [
-                    "I understand. I will provide information about health metrics from the available data while emphasizing the importance of consulting healthcare professionals for personalized advice."
-                ]
-            }
-        ])
-
-        # Add user's health context if available
-        if data:
-            risk_score_text = "Not calculated"
-            if data['risk_score'] is not None:
-                risk_score_text = f"{data['risk_score'] * 100:.1f}%"
-
-            context = {
-                "role": "user",
-                "parts": [
-                    f"Here is the patient's latest health data:\n"
-                    f"- Blood Pressure: {data['blood_pressure'] or 'Not recorded'} mmHg\n"
-                    f"- Heart Rate: {data['heart_rate'] or 'Not recorded'} bpm\n"
-                    f"- Body Temperature: {data['temperature'] or 'Not recorded'} °C\n"
-                    f"- Weight: {data['weight'] or 'Not recorded'} kg\n"
-                    f"- Cholesterol: {data['cholesterol'] or 'Not recorded'} mg/dL\n"
-                    f"- Risk Score: {risk_score_text} (represents the probability of developing heart disease)\n"
-                    f"- Timestamp: {data['timestamp']}\n\n"
-                    "When asked about specific metrics, reply with the actual values from this data if available."
-                ]
-            }
-            chat.send_message(context)
-
-        # Get response from the model
-        response = chat.send_message(message)
-        return response.text.replace("*", "")
-
-    except Exception as e:
-        return f"I apologize, but I'm unable to process your request at the moment. Please try again later. Error: {str(e)}"
-    
-def get_diabetes_chatbot_response(message, user_id):
+        yield
+        outcome = 'ok'
+    except LLMUnavailable:
+        outcome = 'unavailable'
+        raise
+    except GeneratorExit:
+        # The client went away mid-stream and stream_in_pool closed the reply
+        outcome = 'cancelled'
+        raise
+    finally:
+        LLM_CALL_LATENCY.observe(time.perf_counter() - started, domain=domain, mode=mode, outcome=outcome)
+
+def _reply(domain, message, user_id):
     try:
-        # Get health data summary
-        summary = get_diabetes_data_summary(user_id)
-        data = summary['latest'] if summary else None
-
-        # Create a Gemini model instance
-        model = genai.GenerativeModel('gemini-pro')
-
-        # Create a chat instance with the system prompt
-        chat = model.start_chat(history=[
-            {
-                "role": "user",
-                "parts": [
-                    "You are a helpful medical assistant. Provide accurate, cautious, and evidence-based information related to health metrics. "
-                    "When asked about specific health metrics, check the provided health data and give clear answers about the values present. "
-                    "If a value is not available or null, clearly state that. Always advise consulting healthcare professionals for personalized medical advice."
-                ]
-            },
-            {
-                "role": "model",
-                "parts": [
-                    "I understand. I will provide information about health metrics from the available data while emphasizing the importance of consulting healthcare professionals for personalized advice."
-                ]
-            }
-        ])
-
-        # Add user's health context if available
-        if data:
-            risk_score_text = "Not calculated"
-            if data['risk_score'] is not None:
-                risk_score_text = f"{data['risk_score'] * 100:.1f}%"
-
-            context = {
-                "role": "user",
-                "parts": [
-                f"Here is the patient's latest health data:\n"
-                f"- Gender: {data['gender'] or 'Not recorded'}\n"
-                f"- Age: {data['age'] or 'Not recorded'} years\n"
-                f"- Hypertension: {data['hypertension'] or 'Not recorded'} (Yes/No)\n"
-                f"- Heart Disease: {data['heart_disease'] or 'Not recorded'} (Yes/No)\n"
-                f"- Smoking History: {data['smoking_history'] or 'Not recorded'} (Yes/No)\n"
-                f"- BMI: {data['bmi'] or 'Not recorded'} kg/m²\n"
-                f"- HbA1c Level: {data['hba1c_level'] or 'Not recorded'} %\n"
-                f"- Blood Glucose Level: {data['blood_glucose_level'] or 'Not recorded'} mg/dL\n"
-                f"- Risk Score/Diabetes Risk: {risk_score_text} (represents the probability of developing heart disease)\n"
-                f"- Timestamp: {data['timestamp'] or 'Not recorded'}\n\n"
-                "When asked about specific metrics, reply with the actual values from this data if available."
-    ]
-}
+        faq_key = _faq_key(domain, message, user_id)
+        reply = faq_cache.get(faq_key) if faq_key else None
+        if reply is None:
+            chat = _faq_conversation() if faq_key else build_conversation(domain, user_id)
+            with _llm_span(domain, 'send'):
+                reply = llm.send(chat, message).replace("*", "")
+            if faq_key:
+                faq_cache.set(faq_key, reply)
+        session_store.append(user_id, domain, message, reply)
+        return reply
+    except LLMUnavailable:
+        return FALLBACK_MESSAGE
+    except Exception as e:
+        return f"{ERROR_MESSAGE} Error: {str(e)}"
 
-            chat.send_message(context)
+def _stream_reply(stream, domain, message, user_id, faq_key):
+    chunks = []
+    try:
+        with _llm_span(domain, 'stream'):
+            for chunk in stream:
+                text = chunk.replace("*", "")
+                chunks.append(text)
+                yield text
+    finally:
+        stream.close()
+    reply = ''.join(chunks)
+    if faq_key:
+        faq_cache.set(faq_key, reply)
+    session_store.append(user_id, domain, message, reply)
+
+def _failed_stream(error):
+    """
+    An iterator that raises error when read, so the caller reports it the
+    same way as an error from the model
+    """
+    raise error
+    yield
+
+def _stream(domain, message, user_id):
+    try:
+        faq_key = _faq_key(domain, message, user_id)
+        if faq_key:
+            reply = faq_cache.get(faq_key)
+            if reply is not None:
+                session_store.append(user_id, domain, message, reply)
+                return iter([reply])
+            chat = _faq_conversation()
+        else:
+            chat = build_conversation(domain, user_id)
+
+        # Admission (concurrency slot, circuit breaker) happens here, so an
+        # overloaded model gets the fallback without queueing on the LLM pool
+        started = time.perf_counter()
+        stream = llm.stream(chat, message)
+    except LLMUnavailable:
+        LLM_CALL_LATENCY.observe(time.perf_counter() - started, domain=domain, mode='stream', outcome='unavailable')
+        return iter([FALLBACK_MESSAGE])
+    except Exception as e:
+        return _failed_stream(e)
+    # The database read happens on the calling thread, the LLM call on the LLM pool
+    return stream_in_pool(_stream_reply, stream, domain, message, user_id, faq_key)
 
-        # Get response from the model
-        response = chat.send_message(message)
-        return response.text.replace("*", "")
+def get_chatbot_response(message, user_id):
+    return _reply('heart', message, user_id)
 
-    except Exception as e:
-        return f"I apologize, but I'm unable to process your request at the moment. Please try again later. Error: {str(e)}"
\ No newline at end of file
+def get_diabetes_chatbot_response(message, user_id):
+    return _reply('diabetes', message, user_id)
+
+def stream_chatbot_response(message, user_id):
+    """
+    Yield the heart chatbot reply in chunks as the model produces them
+    """
+    return _stream('heart', message, user_id)
+
+def stream_diabetes_chatbot_response(message, user_id):
+    """
+    Yield the diabetes chatbot reply in chunks as the model produces them
+    """
+    return _stream('diabetes', message, user_id)
\ No newline at end of file
@@ -1,17 +1,24 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+import re
+import hmac
+import json
+from functools import wraps
+import click
+from flask import Flask, Response, abort, render_template, request, redirect, url_for, flash, jsonify, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 from sqlalchemy.orm import DeclarativeBase
 from dotenv import load_dotenv
+from utils import (DIABETES_SCHEMA, DIABETES_RECORD_FIELDS, DIABETES_RECORD_DEFAULTS, HEALTH_RECORD_FIELDS,
+                   HEALTH_RECORD_DEFAULTS, validate_record, validate_columns)
 
 load_dotenv() # load the url
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging; DEBUG logging is costly, so production runs at INFO
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 class Base(DeclarativeBase):
@@ -27,6 +34,8 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
 app.secret_key = os.environ.get("SESSION_SECRET")
+# Bearer token for /internal/stats and /metrics; those routes are off when it is unset
+INTERNAL_TOKEN = os.getenv('INTERNAL_TOKEN')
 
 # Initialize extensions
 db.init_app(app)
@@ -34,12 +43,36 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
+# Request, database, model and LLM latency histograms, served at /metrics
+import metrics
+metrics.instrument_app(app)
+metrics.instrument_database()
+
 # Import models after db initialization to avoid circular imports
 from models import User, HealthData, DiabetesData
+from auth import load_session_user, remember_user, hash_password, verify_password, PasswordHashBusy, user_cache
+from model_registry import registry as model_registry, ModelUnavailable
+from healthutils import (get_user_health_data, get_latest_health_data, get_user_diabetes_data, get_latest_diabetes_data,
+                         get_health_data_series, get_diabetes_data_series)
 
 @login_manager.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    return load_session_user(int(user_id))
+
+@app.errorhandler(ModelUnavailable)
+def model_unavailable(e):
+    return jsonify({
+        'error': 'Model not available',
+        'message': str(e)
+    }), 503
+
+@app.route('/healthz/ready')
+def readiness():
+    ready = model_registry.ready()
+    return jsonify({
+        'ready': ready,
+        'models': model_registry.status()
+    }), 200 if ready else 503
 
 @app.route('/')
 def index():
@@ -54,9 +87,13 @@ def login():
         password = request.form.get('password')
         user = User.query.filter_by(email=email).first()
 
-        if user and check_password_hash(user.password_hash, password):
-            login_user(user)
-            return redirect(url_for('dashboard'))
+        try:
+            if user and verify_password(user.password_hash, password):
+                login_user(remember_user(user))
+                return redirect(url_for('dashboard'))
+        except PasswordHashBusy:
+            flash('The server is busy, please try again in a moment', 'error')
+            return render_template('login.html'), 503
         flash('Invalid email or password', 'error')
     return render_template('login.html')
 
@@ -71,21 +108,27 @@ def register():
             flash('Email already registered', 'error')
             return redirect(url_for('register'))
 
+        try:
+            password_hash = hash_password(password)
+        except PasswordHashBusy:
+            flash('The server is busy, please try again in a moment', 'error')
+            return render_template('register.html'), 503
+
         user = User(
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=password_hash,
             name=name
         )
         db.session.add(user)
         db.session.commit()
-        login_user(user)
+        login_user(remember_user(user))
         return redirect(url_for('dashboard'))
     return render_template('register.html')
 
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    health_data = HealthData.query.filter_by(user_id=current_user.id).order_by(HealthData.timestamp.desc()).first()
+    health_data = get_latest_health_data(current_user.id)
     return render_template('dashboard.html', health_data=health_data)
 
 @app.route('/profile')
@@ -93,16 +136,77 @@ def dashboard():
 def profile():
     return render_template('profile.html')
 
+HISTORY_DEFAULT_LIMIT = 6
+HISTORY_MAX_LIMIT = 500
+
+def _history_page_args():
+    """
+    Parse keyset pagination args: before=<ISO timestamp>,<id>&limit=N
+    A bare timestamp (the older cursor format) pages by timestamp alone.
+    """
+    before = request.args.get('before')
+    if before:
+        timestamp, _, row_id = before.partition(',')
+        before = (datetime.fromisoformat(timestamp), int(row_id) if row_id else None)
+    limit = request.args.get('limit', HISTORY_DEFAULT_LIMIT, type=int)
+    if not 1 <= limit <= HISTORY_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {HISTORY_MAX_LIMIT}")
+    return before or None, limit
+
+def _history_response(data, rows, limit):
+    """
+    JSON list oldest-first; X-Next-Before carries the (timestamp, id) cursor
+    for the next (older) page
+    """
+    response = jsonify(data)
+    if len(rows) == limit:
+        response.headers['X-Next-Before'] = f"{rows[-1].timestamp.isoformat()},{rows[-1].id}"
+    return response
+
+# Downsampled history: range defaults per resolution, units in days
+SERIES_DEFAULT_RANGES = {'day': '30d', 'week': '26w', 'month': '12m'}
+SERIES_RANGE_UNITS = {'d': 1, 'w': 7, 'm': 30, 'y': 365}
+
+def _series_args():
+    """
+    Parse downsampling args: resolution=day|week|month&range=<N><d|w|m|y> or all
+    Returns (resolution, start datetime or None for all history)
+    """
+    resolution = request.args.get('resolution')
+    history_range = request.args.get('range', SERIES_DEFAULT_RANGES.get(resolution, 'all'))
+    if history_range == 'all':
+        return resolution, None
+    match = re.fullmatch(r'(\d+)([dwmy])', history_range)
+    if not match:
+        raise ValueError("range must look like 30d, 26w, 12m, 1y or all")
+    days = int(match.group(1)) * SERIES_RANGE_UNITS[match.group(2)]
+    return resolution, datetime.utcnow() - timedelta(days=days)
+
+def _series_response(get_series):
+    try:
+        resolution, start = _series_args()
+        series = get_series(current_user.id, resolution, start)
+    except ValueError as e:
+        return jsonify({'error': 'Invalid history parameters', 'message': str(e)}), 400
+    return jsonify(series)
+
 @app.route('/api/health-history', methods=['GET'])
 @login_required
 def get_health_history():
-    health_data = HealthData.query.filter_by(user_id=current_user.id)\
-        .order_by(HealthData.timestamp.desc())\
-        .limit(6)\
-        .all()
+    if request.args.get('resolution'):
+        return _series_response(get_health_data_series)
+
+    try:
+        before, limit = _history_page_args()
+    except ValueError as e:
+        return jsonify({'error': 'Invalid pagination parameters', 'message': str(e)}), 400
+
+    health_data = get_user_health_data(current_user.id, before=before, limit=limit)
 
     data = [{
         'blood_pressure': h.blood_pressure,
+        'systolic': h.systolic,
+        'diastolic': h.diastolic,
         'heart_rate': h.heart_rate,
         'temperature': h.temperature,
         'weight': h.weight,
@@ -110,36 +214,122 @@ def get_health_history():
         'timestamp': h.timestamp.strftime('%b %d')
     } for h in reversed(health_data)]
 
-    return jsonify(data)
+    return _history_response(data, health_data, limit)
+
+def _chat_message():
+    """
+    The non-blank 'message' string of a chat request's JSON body
+    Raises ValueError if it is missing
+    """
+    data = request.get_json(silent=True)
+    message = data.get('message') if isinstance(data, dict) else None
+    if not isinstance(message, str) or not message.strip():
+        raise ValueError("Message is required")
+    return message
+
+def _invalid_message(e):
+    return jsonify({'error': 'Invalid chat message', 'message': str(e)}), 400
 
 @app.route('/api/chat', methods=['POST'])
 @login_required
 def chat():
     from ai_helper import get_chatbot_response
-    message = request.json.get('message')
+    try:
+        message = _chat_message()
+    except ValueError as e:
+        return _invalid_message(e)
     response = get_chatbot_response(message, current_user.id)
     return jsonify({'response': response})
 
+def _optional(value):
+    # Missing optional fields are None from validate_record and NaN from validate_columns
+    return None if value is None or value != value else float(value)
+
+def _health_data_entry(data, values, risk_score, model_version):
+    """
+    values holds the validated HEALTH_RECORD_FIELDS for data, with
+    blood_pressure split into systolic and diastolic
+    """
+    return HealthData(
+        user_id=current_user.id,
+        age=_optional(values['age']),
+        blood_pressure=data.get('blood_pressure'),
+        systolic=int(values['systolic']),
+        diastolic=int(values['diastolic']),
+        heart_rate=int(values['heart_rate']),
+        temperature=_optional(values['temperature']),
+        weight=_optional(values['weight']),
+        cholesterol=_optional(values['cholesterol']),
+        st_depression=float(values['st_depression']),
+        risk_score=risk_score,  # Store the risk score in the database
+        model_version=model_version
+    )
+
+def _batch_records():
+    """
+    Read a batch payload: either a JSON list or {"records": [...]}
+    """
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        payload = payload.get('records')
+    if not isinstance(payload, list) or not all(isinstance(r, dict) for r in payload):
+        raise ValueError("Expected a JSON list of records")
+    return payload
+
+def _sse_response(chunks):
+    """
+    Stream text chunks as Server-Sent Events: one 'data' event per chunk,
+    then a 'done' event, or an 'error' event if the model call fails
+    """
+    def events():
+        try:
+            for chunk in chunks:
+                yield f"data: {json.dumps({'text': chunk})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+        finally:
+            # On client disconnect this tells the LLM pool to stop producing
+            close = getattr(chunks, 'close', None)
+            if close:
+                close()
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/chat/stream', methods=['POST'])
+@login_required
+def chat_stream():
+    from ai_helper import stream_chatbot_response
+    try:
+        message = _chat_message()
+    except ValueError as e:
+        return _invalid_message(e)
+    return _sse_response(stream_chatbot_response(message, current_user.id))
+
 @app.route('/api/health-data', methods=['POST'])
 @login_required
 def update_health_data():
-    from risk_model import predict_heart_disease_risk
+    risk_model = model_registry.get('heart')
     data = request.json
 
     try:
-        # Calculate risk score first
-        risk_score = predict_heart_disease_risk(data)
+        values = validate_record(data, HEALTH_RECORD_FIELDS, defaults=HEALTH_RECORD_DEFAULTS)
+        # Calculate risk score first; this also checks the model's features
+        # (age and cholesterol), which a stored reading may leave out
+        risk_score = risk_model.predict_heart_disease_risk(data)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid health data',
+            'message': str(e)
+        }), 400
 
+    try:
         # Create new health data entry with risk score
-        health_data = HealthData(
-            user_id=current_user.id,
-            blood_pressure=data.get('blood_pressure'),
-            heart_rate=data.get('heart_rate'),
-            temperature=data.get('temperature'),
-            weight=data.get('weight'),
-            cholesterol = data.get('cholesterol'),
-            risk_score=risk_score  # Store the risk score in the database
-        )
+        health_data = _health_data_entry(data, values, risk_score, risk_model.MODEL_VERSION)
 
         # Save to database
         db.session.add(health_data)
@@ -157,19 +347,63 @@ def update_health_data():
             'message': str(e)
         }), 500
 
+@app.route('/api/health-data/batch', methods=['POST'])
+@login_required
+def update_health_data_batch():
+    risk_model = model_registry.get('heart')
+
+    try:
+        records = _batch_records()
+        # Check the stored fields for the whole batch at once before scoring
+        values, _, errors = validate_columns(records, HEALTH_RECORD_FIELDS, defaults=HEALTH_RECORD_DEFAULTS)
+        if errors:
+            index, message = errors[0]
+            raise ValueError(f"Invalid record at index {index}: {message}")
+        risk_scores = risk_model.predict_heart_disease_risk_batch(records)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid health data batch',
+            'message': str(e)
+        }), 400
+
+    try:
+        # Insert every row in a single transaction
+        stored = values.to_dict('records')
+        db.session.add_all([_health_data_entry(data, row, score, risk_model.MODEL_VERSION)
+                            for data, row, score in zip(records, stored, risk_scores)])
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Data updated successfully',
+            'count': len(records),
+            'risk_scores': risk_scores
+        })
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error updating health data batch: {str(e)}")
+        return jsonify({
+            'error': 'Failed to update health data',
+            'message': str(e)
+        }), 500
+
 @app.route('/diabetes-dashboard')
 @login_required
 def diabetes_dashboard():
-    diabetes_data = DiabetesData.query.filter_by(user_id=current_user.id).order_by(DiabetesData.timestamp.desc()).first()
+    diabetes_data = get_latest_diabetes_data(current_user.id)
     return render_template('diabetes_dashboard.html', diabetes_data=diabetes_data)
 
 @app.route('/api/diabetes-history', methods=['GET'])
 @login_required
 def get_diabetes_history():
-    diabetes_data = DiabetesData.query.filter_by(user_id=current_user.id)\
-        .order_by(DiabetesData.timestamp.desc())\
-        .limit(6)\
-        .all()
+    if request.args.get('resolution'):
+        return _series_response(get_diabetes_data_series)
+
+    try:
+        before, limit = _history_page_args()
+    except ValueError as e:
+        return jsonify({'error': 'Invalid pagination parameters', 'message': str(e)}), 400
+
+    diabetes_data = get_user_diabetes_data(current_user.id, before=before, limit=limit)
 
     data = [{
         'blood_glucose_level': d.blood_glucose_level,
@@ -177,30 +411,46 @@ def get_diabetes_history():
         'timestamp': d.timestamp.strftime('%b %d')
     } for d in reversed(diabetes_data)]
 
-    return jsonify(data)
+    return _history_response(data, diabetes_data, limit)
+
+def _diabetes_data_entry(values, risk_score, model_version):
+    """
+    values holds the validated DIABETES_RECORD_FIELDS of one record
+    """
+    return DiabetesData(
+        user_id=current_user.id,
+        gender=values['gender'],
+        age=float(values['age']),
+        hypertension=bool(values['hypertension']),
+        heart_disease=bool(values['heart_disease']),
+        smoking_history=values['smoking_history'],
+        bmi=float(values['bmi']),
+        hba1c_level=float(values['hba1c_level']),
+        blood_glucose_level=float(values['blood_glucose_level']),
+        risk_score=risk_score,
+        model_version=model_version
+    )
 
 @app.route('/api/diabetes-data', methods=['POST'])
 @login_required
 def update_diabetes_data():
     data = request.json
-    from diabetes_model import predict_diabetes_risk
+    diabetes_model = model_registry.get('diabetes')
+
+    try:
+        values = validate_record(data, DIABETES_RECORD_FIELDS, DIABETES_SCHEMA, DIABETES_RECORD_DEFAULTS)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid diabetes data',
+            'message': str(e)
+        }), 400
+
     try:
         # Get risk score from the model
-        risk_score = predict_diabetes_risk(data)
+        risk_score = diabetes_model.predict_diabetes_risk(data)
 
         # Create new diabetes data entry
-        diabetes_data = DiabetesData(
-            user_id=current_user.id,
-            gender=data.get('gender'),
-            age=float(data.get('age')),
-            hypertension=bool(int(data.get('hypertension'))),
-            heart_disease=bool(int(data.get('heart_disease'))),
-            smoking_history=data.get('smoking_history'),
-            bmi=float(data.get('bmi')),
-            hba1c_level=float(data.get('hba1c_level')),
-            blood_glucose_level=float(data.get('blood_glucose_level')),
-            risk_score=risk_score
-        )
+        diabetes_data = _diabetes_data_entry(values, risk_score, diabetes_model.MODEL_VERSION)
 
         db.session.add(diabetes_data)
         db.session.commit()
@@ -217,23 +467,206 @@ def update_diabetes_data():
             'message': str(e)
         }), 500
 
+@app.route('/api/diabetes-data/batch', methods=['POST'])
+@login_required
+def update_diabetes_data_batch():
+    diabetes_model = model_registry.get('diabetes')
+
+    try:
+        records = _batch_records()
+        # Check the stored fields for the whole batch at once before scoring
+        values, _, errors = validate_columns(records, DIABETES_RECORD_FIELDS, DIABETES_SCHEMA, DIABETES_RECORD_DEFAULTS)
+        if errors:
+            index, message = errors[0]
+            raise ValueError(f"Invalid record at index {index}: {message}")
+        risk_scores = diabetes_model.predict_diabetes_risk_batch(records)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid diabetes data batch',
+            'message': str(e)
+        }), 400
+
+    try:
+        # Insert every row in a single transaction
+        stored = values.to_dict('records')
+        db.session.add_all([_diabetes_data_entry(row, score, diabetes_model.MODEL_VERSION)
+                            for row, score in zip(stored, risk_scores)])
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Data updated successfully',
+            'count': len(records),
+            'risk_scores': risk_scores
+        })
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error updating diabetes data batch: {str(e)}")
+        return jsonify({
+            'error': 'Failed to update diabetes data',
+            'message': str(e)
+        }), 500
+
 @app.route('/api/diabetes-chat', methods=['POST'])
 @login_required
 def diabetes_chat():
     from ai_helper import get_diabetes_chatbot_response
-    message = request.json.get('message')
+    try:
+        message = _chat_message()
+    except ValueError as e:
+        return _invalid_message(e)
     response = get_diabetes_chatbot_response(message, current_user.id)
     return jsonify({'response': response})
 
+@app.route('/api/diabetes-chat/stream', methods=['POST'])
+@login_required
+def diabetes_chat_stream():
+    from ai_helper import stream_diabetes_chatbot_response
+    try:
+        message = _chat_message()
+    except ValueError as e:
+        return _invalid_message(e)
+    return _sse_response(stream_diabetes_chatbot_response(message, current_user.id))
+
+def _import_upload(kind):
+    """
+    Import an uploaded file (multipart field 'file') or a raw request body.
+    Format comes from ?format=csv|ndjson, else the file name or content type.
+    """
+    from bulk_import import import_readings, detect_format, FORMATS
+
+    upload = request.files.get('file')
+    if upload is not None:
+        stream, fmt = upload.stream, detect_format(upload.filename, upload.mimetype)
+    else:
+        stream, fmt = request.stream, detect_format(mimetype=request.mimetype)
+    fmt = request.args.get('format', fmt)
+    if fmt not in FORMATS:
+        return jsonify({'error': 'Unsupported format', 'message': f"format must be one of {', '.join(FORMATS)}"}), 400
+
+    try:
+        report = import_readings(kind, current_user.id, stream, fmt)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error importing {kind} data: {str(e)}")
+        return jsonify({'error': f'Failed to import {kind} data', 'message': str(e)}), 500
+    return jsonify(report)
+
+@app.route('/api/health-data/import', methods=['POST'])
+@login_required
+def import_health_data():
+    return _import_upload('health')
+
+@app.route('/api/diabetes-data/import', methods=['POST'])
+@login_required
+def import_diabetes_data():
+    return _import_upload('diabetes')
+
+def _export_download(kind):
+    """
+    Stream the user's readings as ?format=csv|ndjson, optionally bounded by
+    ?start=<ISO date>&end=<ISO date> (end exclusive)
+    """
+    from bulk_export import export_readings, FORMATS
+
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        return jsonify({'error': 'Unsupported format', 'message': f"format must be one of {', '.join(FORMATS)}"}), 400
+    try:
+        start, end = (datetime.fromisoformat(request.args[k]) if request.args.get(k) else None for k in ('start', 'end'))
+    except ValueError as e:
+        return jsonify({'error': 'Invalid date range', 'message': str(e)}), 400
+
+    chunks = export_readings(kind, current_user.id, fmt, start, end)
+    return Response(stream_with_context(chunks), mimetype=FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename="{kind}-data.{fmt}"'
+    })
+
+@app.route('/api/health-data/export', methods=['GET'])
+@login_required
+def export_health_data():
+    return _export_download('health')
+
+@app.route('/api/diabetes-data/export', methods=['GET'])
+@login_required
+def export_diabetes_data():
+    return _export_download('diabetes')
+
+def internal_only(view):
+    """
+    Serve the view only to requests carrying 'Authorization: Bearer <INTERNAL_TOKEN>'
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not INTERNAL_TOKEN:
+            abort(404)
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), INTERNAL_TOKEN.encode()):
+            return jsonify({'error': 'Unauthorized'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.route('/internal/stats')
+@internal_only
+def internal_stats():
+    from cache import prediction_caches
+    from chat_sessions import session_store
+    from faq_cache import faq_cache
+    from llm_client import llm
+    return jsonify({
+        'prediction_cache': {name: cache.stats() for name, cache in prediction_caches.items()},
+        'chat_sessions': session_store.stats(),
+        'faq_cache': faq_cache.stats(),
+        'user_cache': user_cache.stats(),
+        'llm_client': llm.metrics()
+    })
+
+@app.route('/metrics')
+@internal_only
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/logout')
 @login_required
 def logout():
     logout_user()
     return redirect(url_for('login'))
 
+@app.cli.command('import-readings')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--email', required=True, help='Email of the user who owns the readings')
+@click.option('--kind', type=click.Choice(['health', 'diabetes']), required=True)
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='Defaults to the file extension')
+def import_readings_command(path, email, kind, fmt):
+    """Bulk import historical readings from a CSV or NDJSON file."""
+    from bulk_import import import_readings, detect_format
+
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        raise click.ClickException(f"No user with email {email}")
+    with open(path, 'rb') as f:
+        report = import_readings(kind, user.id, f, fmt or detect_format(path))
+    for error in report['errors']:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(f"Imported {report['imported']} {kind} readings, {report['failed']} failed")
+
+@app.cli.command('db-upgrade')
+def db_upgrade_command():
+    """Apply schema changes and backfills to an existing database.
+
+    Run once per deploy, before starting the workers: the DDL isn't safe
+    for several workers to run at once as they boot.
+    """
+    from migrations import upgrade
+    upgrade(db)
+    click.echo("Database is up to date")
+
 with app.app_context():
-    # Create all database tables
+    # Create missing tables; changes to existing tables are applied by `flask db-upgrade`
     db.create_all()
 
+# Warm both risk models in the background so the first request doesn't pay for loading
+if os.getenv('MODEL_WARMUP', '1') == '1':
+    model_registry.start()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
@@ -0,0 +1,106 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask_login import UserMixin
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash, check_password_hash
+from cache import TTLCache
+from models import User
+
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 4096))
+# Short, so a change made by another worker process is picked up quickly
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', 60))
+
+# Password hashing is deliberately slow and memory hungry, so only a few
+# hashes run at once and at most PASSWORD_HASH_QUEUE more wait for a worker.
+# Beyond that a login is rejected before anything is queued.
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 8))
+PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 5))
+
+hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash')
+# One slot per running or queued hash, released when the hash finishes
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+
+class SessionUser(UserMixin):
+    """
+    The identity fields of a User, detached from any database session.
+    This is what current_user holds for authenticated requests.
+    """
+
+    __slots__ = ('id', 'email', 'name', 'created_at')
+
+    def __init__(self, id, email, name, created_at):
+        self.id = id
+        self.email = email
+        self.name = name
+        self.created_at = created_at
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.email, user.name, user.created_at)
+
+# user id -> SessionUser
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+def load_session_user(user_id):
+    """
+    Return the SessionUser for user_id, from the cache or with one query for
+    the identity columns. Returns None if the user no longer exists.
+    """
+    user = user_cache.get(user_id)
+    if user is None:
+        row = User.query.with_entities(User.id, User.email, User.name, User.created_at).filter_by(id=user_id).first()
+        if row is None:
+            return None
+        user = SessionUser(*row)
+        user_cache.set(user_id, user)
+    return user
+
+def remember_user(user):
+    """
+    Cache the identity of a User just loaded or created, e.g. at login
+    """
+    session_user = SessionUser.from_user(user)
+    user_cache.set(user.id, session_user)
+    return session_user
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user(mapper, connection, target):
+    # Only this process's cache; other workers catch up within USER_CACHE_TTL
+    user_cache.pop(target.id)
+
+class PasswordHashBusy(Exception):
+    """
+    Raised when the hashing pool and its queue are full, or a hash did not
+    finish within PASSWORD_HASH_TIMEOUT
+    """
+
+def _run_hash(fn, *args):
+    """
+    Run fn(*args) on the hashing pool. A hash that times out keeps running
+    and keeps its worker and slot until it finishes (a started hash can't be
+    cancelled), so later logins are rejected up front rather than queued
+    behind it.
+    """
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashBusy("Too many sign-ins in progress")
+    try:
+        future = hash_executor.submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    try:
+        return future.result(timeout=PASSWORD_HASH_TIMEOUT)
+    except FutureTimeoutError:
+        # Drops the hash if it is still queued; a running one finishes anyway
+        future.cancel()
+        raise PasswordHashBusy("Sign-in took too long")
+
+def hash_password(password):
+    return _run_hash(generate_password_hash, password)
+
+def verify_password(password_hash, password):
+    return _run_hash(check_password_hash, password_hash, password)
@@ -0,0 +1,62 @@
+"""
+Chat turn latency and LLM round trips against the fake backend: the old
+flow (system turn, then send_message(context), then send_message(message))
+vs one pre-built conversation.
+
+Run from the repository root:
+    python -m benchmarks.bench_chat [--delay SECONDS] [--turns N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+SAMPLE_CONTEXT = (
+    "Here is the patient's latest health data:\n"
+    "- Blood Pressure: 130/85 mmHg\n"
+    "- Heart Rate: 80 bpm\n"
+    "- Cholesterol: 220 mg/dL"
+)
+
+def legacy_turn(llm_client, ai_helper, message):
+    model = llm_client.FakeModel()
+    chat = model.start_chat(history=[
+        {"role": "user", "parts": [ai_helper.SYSTEM_PROMPT]},
+        {"role": "model", "parts": [ai_helper.SYSTEM_ACK]}
+    ])
+    chat.send_message({"role": "user", "parts": [f"{SAMPLE_CONTEXT}\n\n{ai_helper.CONTEXT_FOOTER}"]})
+    chat.send_message(message)
+    return model.calls
+
+def single_turn(llm_client, ai_helper, message):
+    model = llm_client.get_model()
+    before = model.calls
+    model.start_chat(history=ai_helper.conversation_history(SAMPLE_CONTEXT)).send_message(message)
+    return model.calls - before
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--delay', type=float, default=0.05, help='Simulated seconds per LLM round trip')
+    parser.add_argument('--turns', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ['LLM_BACKEND'] = 'fake'
+    os.environ['FAKE_LLM_DELAY'] = str(args.delay)
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    os.environ.setdefault('MODEL_WARMUP', '0')
+
+    import app  # initializes db before ai_helper pulls in the models
+    import llm_client
+    import ai_helper
+
+    print(f"{'flow':<10}{'round trips/turn':>18}{'ms/turn':>10}")
+    for name, turn in (('legacy', legacy_turn), ('single', single_turn)):
+        calls = 0
+        start = time.perf_counter()
+        for i in range(args.turns):
+            calls += turn(llm_client, ai_helper, f"Is my heart rate normal? ({i})")
+        elapsed = (time.perf_counter() - start) / args.turns
+        print(f"{name:<10}{calls / args.turns:>18.1f}{elapsed * 1e3:>10.1f}")
+
+if __name__ == '__main__':
+    main()
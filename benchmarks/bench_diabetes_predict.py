@@ -0,0 +1,72 @@
+"""
+Single-row diabetes prediction: DataFrame reference path vs the NumPy fast path.
+
+Run from the repository root:
+    python -m benchmarks.bench_diabetes_predict [--iterations N]
+"""
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Measure the model path, not prediction cache hits
+os.environ.setdefault('PREDICTION_CACHE_SIZE', '0')
+
+import diabetes_model
+from diabetes_model import predict_diabetes_risk, _predict_diabetes_risk_dataframe
+from model_training import DIABETES_DATASET
+
+def sample_records(n, seed=0):
+    df = pd.read_csv(DIABETES_DATASET).sample(n, random_state=seed)
+    return [{
+        'age': row.age,
+        'bmi': row.bmi,
+        'hba1c_level': row.HbA1c_level,
+        'blood_glucose_level': row.blood_glucose_level,
+        'hypertension': row.hypertension,
+        'heart_disease': row.heart_disease,
+        'smoking_history': row.smoking_history
+    } for row in df.itertuples()]
+
+def check_parity(records):
+    fast = np.array([predict_diabetes_risk(r) for r in records])
+    reference = np.array([_predict_diabetes_risk_dataframe(r) for r in records])
+    np.testing.assert_allclose(fast, reference, rtol=0, atol=1e-12)
+    return len(records)
+
+def time_calls(fn, records, iterations):
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        record = records[i % len(records)]
+        start = time.perf_counter()
+        fn(record)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e3
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--parity-rows', type=int, default=500)
+    args = parser.parse_args()
+
+    records = sample_records(max(args.parity_rows, 50))
+    print(f"parity: {check_parity(records[:args.parity_rows])} rows identical "
+          f"(model version {diabetes_model.MODEL_VERSION})")
+
+    # Warm both paths before timing
+    time_calls(predict_diabetes_risk, records, 20)
+    time_calls(_predict_diabetes_risk_dataframe, records, 20)
+
+    print(f"{'path':<12}{'p50 ms':>10}{'p99 ms':>10}")
+    results = {}
+    for name, fn in (('dataframe', _predict_diabetes_risk_dataframe), ('fast', predict_diabetes_risk)):
+        timings = time_calls(fn, records, args.iterations)
+        results[name] = np.percentile(timings, [50, 99])
+        print(f"{name:<12}{results[name][0]:>10.3f}{results[name][1]:>10.3f}")
+
+    gain = results['dataframe'] - results['fast']
+    print(f"{'saved':<12}{gain[0]:>10.3f}{gain[1]:>10.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Diabetes RandomForest inference: sklearn predict_proba vs the flat-array engine.
+
+Run from the repository root:
+    python -m benchmarks.bench_forest_engine [--repeat N]
+"""
+import argparse
+import time
+import numpy as np
+
+import diabetes_model
+from diabetes_model import diabetes_model as forest, flat_forest, feature_columns, _encode_record, _scale
+from benchmarks.bench_diabetes_predict import sample_records
+
+BATCH_SIZES = (1, 64, 10000)
+
+def encode(records):
+    features = np.zeros((len(records), len(feature_columns)), dtype=np.float64)
+    for i, record in enumerate(records):
+        _encode_record(record, features[i])
+    return _scale(features)
+
+def check_parity(X):
+    reference = forest.predict_proba(X)
+    flat = flat_forest.predict_proba(X)
+    np.testing.assert_allclose(flat, reference, rtol=0, atol=1e-12)
+    return len(X)
+
+def throughput(predict, X, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return best * 1e3, len(X) / best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    X = encode(sample_records(max(BATCH_SIZES)))
+    print(f"parity: {check_parity(X)} rows identical (model version {diabetes_model.MODEL_VERSION}, "
+          f"{len(flat_forest.feature)} nodes, max depth {flat_forest.max_depth})")
+
+    print(f"{'batch':>8}{'engine':>10}{'ms/batch':>12}{'rows/s':>14}")
+    for size in BATCH_SIZES:
+        batch = X[:size]
+        for name, predict in (('sklearn', forest.predict_proba), ('flat', flat_forest.predict_proba)):
+            predict(batch)
+            ms, rows_per_second = throughput(predict, batch, args.repeat)
+            print(f"{size:>8}{name:>10}{ms:>12.3f}{rows_per_second:>14,.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Heart disease scoring: sklearn scaler + predict_proba vs the closed-form scorer.
+
+Run from the repository root:
+    python -m benchmarks.bench_heart_scorer [--iterations N]
+"""
+import argparse
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+import risk_model
+from risk_model import scorer, _sklearn_risk
+from model_training import HEART_DATASET
+
+def sample_features():
+    df = pd.read_csv(HEART_DATASET)
+    return df[['age', 'trestbps', 'chol', 'thalach', 'oldpeak']].to_numpy(dtype=np.float64)
+
+def check_parity(X):
+    np.testing.assert_allclose(scorer.score(X), _sklearn_risk(X), rtol=0, atol=1e-12)
+    for row in X[:50]:
+        np.testing.assert_allclose(scorer.score(row), _sklearn_risk(row)[0], rtol=0, atol=1e-12)
+    return len(X)
+
+def time_calls(fn, X, iterations):
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(X)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e3
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    # The scaler was fitted on a DataFrame; silence its feature-name warning for arrays
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+    X = sample_features()
+    print(f"parity: {check_parity(X)} rows identical (model version {risk_model.MODEL_VERSION})")
+
+    print(f"{'input':<10}{'path':<14}{'p50 ms':>10}{'p99 ms':>10}")
+    for label, data in (('1 row', X[0]), (f'{len(X)} rows', X)):
+        for name, fn in (('sklearn', _sklearn_risk), ('closed-form', scorer.score)):
+            timings = time_calls(fn, data, args.iterations)
+            p50, p99 = np.percentile(timings, [50, 99])
+            print(f"{label:<10}{name:<14}{p50:>10.4f}{p99:>10.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Chatbot summary queries: loading a user's full history vs one aggregate query.
+
+Seeds a throwaway SQLite database (or DATABASE_URL if --use-database-url) and
+runs from the repository root:
+    python -m benchmarks.bench_summaries [--users N] [--records M]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def seed(db, HealthData, DiabetesData, User, users, records):
+    rng = random.Random(0)
+    start = datetime.utcnow() - timedelta(minutes=records)
+    user_ids = []
+    for n in range(users):
+        user = User(email=f"bench{n}@example.com", password_hash='x', name=f"Bench {n}")
+        db.session.add(user)
+        db.session.flush()
+        user_ids.append(user.id)
+        db.session.bulk_insert_mappings(HealthData, [{
+            'user_id': user.id,
+            'blood_pressure': f"{rng.randint(100, 160)}/{rng.randint(60, 100)}",
+            'heart_rate': rng.randint(50, 120),
+            'temperature': round(rng.uniform(36.0, 38.0), 1),
+            'weight': round(rng.uniform(50, 120), 1),
+            'cholesterol': rng.uniform(150, 300),
+            'risk_score': rng.random(),
+            'timestamp': start + timedelta(minutes=i)
+        } for i in range(records)])
+        db.session.bulk_insert_mappings(DiabetesData, [{
+            'user_id': user.id,
+            'gender': 'Female',
+            'age': 50.0,
+            'hypertension': False,
+            'heart_disease': False,
+            'smoking_history': 'never',
+            'bmi': rng.uniform(18, 40),
+            'hba1c_level': rng.uniform(4, 9),
+            'blood_glucose_level': rng.uniform(80, 250),
+            'risk_score': rng.random(),
+            'timestamp': start + timedelta(minutes=i)
+        } for i in range(records)])
+    db.session.commit()
+    return user_ids
+
+def full_history_summary(get_all, user_id):
+    """
+    The previous implementation: materialize every row to read data[0] and len(data)
+    """
+    data = get_all(user_id)
+    if not data:
+        return None
+    return {'latest': data[0], 'count': len(data)}
+
+def time_calls(fn, user_ids, repeat):
+    timings = []
+    for _ in range(repeat):
+        for user_id in user_ids:
+            start = time.perf_counter()
+            fn(user_id)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1e3, timings[int(len(timings) * 0.99)] * 1e3
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=3)
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--use-database-url', action='store_true', help='Seed DATABASE_URL instead of a temp SQLite file')
+    args = parser.parse_args()
+
+    if not args.use_database_url:
+        tmpdir = tempfile.mkdtemp()
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ.setdefault('MODEL_WARMUP', '0')
+
+    from app import app, db
+    from models import User, HealthData, DiabetesData
+    import healthutils
+
+    with app.app_context():
+        user_ids = seed(db, HealthData, DiabetesData, User, args.users, args.records)
+        print(f"seeded {args.users} users x {args.records} readings per table")
+
+        cases = (
+            ('health/full', lambda uid: full_history_summary(healthutils.get_user_health_data, uid)),
+            ('health/aggregate', healthutils.get_health_data_summary),
+            ('diabetes/full', lambda uid: full_history_summary(healthutils.get_user_diabetes_data, uid)),
+            ('diabetes/aggregate', healthutils.get_diabetes_data_summary),
+        )
+        print(f"{'summary':<22}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, fn in cases:
+            fn(user_ids[0])
+            db.session.expunge_all()
+            p50, p99 = time_calls(fn, user_ids, args.repeat)
+            print(f"{name:<22}{p50:>10.2f}{p99:>10.2f}")
+
+if __name__ == '__main__':
+    main()
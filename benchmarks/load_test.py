@@ -0,0 +1,297 @@
+"""
+Load test for the Flask endpoints: throughput and p50/p95/p99 latency per
+endpoint at a given client concurrency, saved as JSON for regression checks.
+
+Boots the app on a threaded local server against a throwaway SQLite database
+(or DATABASE_URL with --use-database-url, e.g. a local Postgres), seeds users
+with readings, and replaces the LLM with the fake backend. Run from the
+repository root:
+    python -m benchmarks.load_test [--users N] [--readings M] [--concurrency C]
+                                   [--requests R] [--scenarios a,b] [--llm-delay S]
+                                   [--output PATH] [--compare PATH]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+
+PASSWORD = 'load-test-password'
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+CHAT_MESSAGES = [
+    "How is my blood pressure?",
+    "Is my latest heart rate normal?",
+    "What is a normal cholesterol level?",
+    "How can I lower my risk?",
+]
+
+def health_payload(rng):
+    return {
+        'age': rng.randint(30, 80),
+        'blood_pressure': f"{rng.randint(100, 170)}/{rng.randint(60, 100)}",
+        'cholesterol': rng.randint(150, 320),
+        'heart_rate': rng.randint(50, 120),
+        'temperature': round(rng.uniform(36.0, 38.0), 1),
+        'weight': round(rng.uniform(50, 120), 1),
+        'st_depression': round(rng.uniform(0, 3), 1),
+    }
+
+def diabetes_payload(rng):
+    return {
+        'gender': rng.choice(['Male', 'Female']),
+        'age': rng.randint(20, 80),
+        'hypertension': rng.randint(0, 1),
+        'heart_disease': rng.randint(0, 1),
+        'smoking_history': rng.choice(['never', 'former', 'current', 'No Info']),
+        'bmi': round(rng.uniform(18, 40), 1),
+        'hba1c_level': round(rng.uniform(4, 9), 1),
+        'blood_glucose_level': rng.randint(80, 250),
+    }
+
+def chat_payload(rng):
+    return {'message': rng.choice(CHAT_MESSAGES)}
+
+# name -> (method, path, JSON body factory or None, streamed response)
+SCENARIOS = {
+    'health-data': ('POST', '/api/health-data', health_payload, False),
+    'diabetes-data': ('POST', '/api/diabetes-data', diabetes_payload, False),
+    'health-history': ('GET', '/api/health-history', None, False),
+    'diabetes-history': ('GET', '/api/diabetes-history', None, False),
+    'chat': ('POST', '/api/chat', chat_payload, False),
+    'chat-stream': ('POST', '/api/chat/stream', chat_payload, True),
+    'diabetes-chat': ('POST', '/api/diabetes-chat', chat_payload, False),
+    'diabetes-chat-stream': ('POST', '/api/diabetes-chat/stream', chat_payload, True),
+}
+
+def seed(db, User, HealthData, DiabetesData, password_hash, users, readings):
+    """
+    Create users, each with `readings` health and diabetes rows an hour apart
+
+    Returns:
+        list: The seeded users' emails
+    """
+    rng = random.Random(0)
+    run = uuid.uuid4().hex[:8]
+    start = datetime.utcnow() - timedelta(hours=readings)
+    emails = []
+    for n in range(users):
+        user = User(email=f"load-{run}-{n}@example.com", password_hash=password_hash, name=f"Load {n}")
+        db.session.add(user)
+        db.session.flush()
+        emails.append(user.email)
+        health = []
+        for i in range(readings):
+            row = health_payload(rng)
+            systolic, diastolic = row['blood_pressure'].split('/')
+            health.append(dict(row, user_id=user.id, systolic=int(systolic), diastolic=int(diastolic),
+                               risk_score=rng.random(), timestamp=start + timedelta(hours=i)))
+        db.session.bulk_insert_mappings(HealthData, health)
+        db.session.bulk_insert_mappings(DiabetesData, [
+            dict(diabetes_payload(rng), user_id=user.id, risk_score=rng.random(), timestamp=start + timedelta(hours=i))
+            for i in range(readings)
+        ])
+        db.session.commit()
+    return emails
+
+def start_server(app):
+    """
+    Serve the app from a threaded local server on a free port
+    """
+    from werkzeug.serving import make_server
+    # Werkzeug logs every request at INFO, which would dominate the timings
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def login(base_url, email):
+    session = requests.Session()
+    response = session.post(f"{base_url}/login", data={'email': email, 'password': PASSWORD}, allow_redirects=False)
+    if response.status_code != 302 or 'login' in response.headers.get('Location', ''):
+        raise RuntimeError(f"Could not log in as {email}")
+    return session
+
+def _request(session, base_url, scenario, rng):
+    """
+    One request of a scenario, read to the end
+
+    Returns:
+        tuple: (seconds, status code or None if the request failed)
+    """
+    method, path, payload, streamed = SCENARIOS[scenario]
+    body = payload(rng) if payload else None
+    started = time.perf_counter()
+    try:
+        response = session.request(method, f"{base_url}{path}", json=body, stream=streamed)
+        if streamed:
+            for _ in response.iter_content(chunk_size=None):
+                pass
+        else:
+            response.content
+        return time.perf_counter() - started, response.status_code
+    except requests.RequestException:
+        return time.perf_counter() - started, None
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+def run_scenario(scenario, base_url, sessions, concurrency, total, warmup):
+    """
+    Send `total` requests from `concurrency` client threads, each request as a
+    randomly chosen seeded user
+
+    Returns:
+        dict: Throughput, latency percentiles in milliseconds and status counts
+    """
+    warm_rng = random.Random(1)
+    for _ in range(warmup):
+        _request(warm_rng.choice(sessions), base_url, scenario, warm_rng)
+
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        results = []
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return results
+            results.append(_request(rng.choice(sessions), base_url, scenario, rng))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [r for rs in pool.map(worker, range(concurrency)) for r in rs]
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(seconds * 1e3 for seconds, _ in results)
+    statuses = {}
+    for _, status in results:
+        key = str(status) if status is not None else 'failed'
+        statuses[key] = statuses.get(key, 0) + 1
+    return {
+        'requests': len(results),
+        'errors': sum(1 for _, status in results if status is None or status >= 400),
+        'seconds': elapsed,
+        'throughput_rps': len(results) / elapsed if elapsed else 0.0,
+        'mean_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'max_ms': latencies[-1] if latencies else 0.0,
+        'statuses': statuses
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _print_results(report, baseline=None):
+    print(f"\n{'scenario':<22}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}", end='')
+    print(f"{'req/s vs base':>15}{'p95 vs base':>13}" if baseline else '')
+    for name, r in report['scenarios'].items():
+        print(f"{name:<22}{r['throughput_rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+              f"{r['p99_ms']:>9.1f}{r['errors']:>8}", end='')
+        base = (baseline or {}).get('scenarios', {}).get(name)
+        if base:
+            throughput = (r['throughput_rps'] / base['throughput_rps'] - 1) * 100 if base['throughput_rps'] else 0.0
+            p95 = (r['p95_ms'] / base['p95_ms'] - 1) * 100 if base['p95_ms'] else 0.0
+            print(f"{throughput:>+14.1f}%{p95:>+12.1f}%")
+        else:
+            print()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--readings', type=int, default=500, help='Health and diabetes readings seeded per user')
+    parser.add_argument('--concurrency', type=int, default=8, help='Client threads')
+    parser.add_argument('--requests', type=int, default=400, help='Requests per scenario')
+    parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per scenario')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated subset of: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--llm-delay', type=float, default=0.05, help='Simulated seconds per LLM round trip')
+    parser.add_argument('--use-database-url', action='store_true', help='Seed DATABASE_URL instead of a temp SQLite file')
+    parser.add_argument('--output', help='Results JSON path (default: benchmarks/results/load-test-<time>.json)')
+    parser.add_argument('--compare', help='Earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    if not args.use_database_url:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load.db')}"
+    os.environ['LLM_BACKEND'] = 'fake'
+    os.environ['FAKE_LLM_DELAY'] = str(args.llm_delay)
+    os.environ.setdefault('SESSION_SECRET', 'load-test')
+    os.environ.setdefault('MODEL_WARMUP', '0')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    from werkzeug.security import generate_password_hash
+    from app import app, db
+    from models import User, HealthData, DiabetesData
+
+    with app.app_context():
+        # An existing DATABASE_URL may predate the current schema
+        from migrations import upgrade
+        upgrade(db)
+        started = time.perf_counter()
+        emails = seed(db, User, HealthData, DiabetesData, generate_password_hash(PASSWORD), args.users, args.readings)
+        dialect = db.engine.dialect.name
+        print(f"seeded {args.users} users x {args.readings} readings per table on {dialect} "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    server, base_url = start_server(app)
+    try:
+        sessions = [login(base_url, email) for email in emails]
+        report = {
+            'started_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'git_commit': _git_commit(),
+            'config': {
+                'database': dialect,
+                'users': args.users,
+                'readings': args.readings,
+                'concurrency': args.concurrency,
+                'requests': args.requests,
+                'warmup': args.warmup,
+                'llm_delay': args.llm_delay,
+                'cpus': os.cpu_count()
+            },
+            'scenarios': {}
+        }
+        for scenario in scenarios:
+            report['scenarios'][scenario] = run_scenario(
+                scenario, base_url, sessions, args.concurrency, args.requests, args.warmup)
+            print(f"{scenario}: {report['scenarios'][scenario]['throughput_rps']:.1f} req/s")
+    finally:
+        server.shutdown()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    _print_results(report, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-test-{datetime.utcnow():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {output}")
+
+if __name__ == '__main__':
+    main()
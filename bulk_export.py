@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from sqlalchemy import select
+from app import db
+from models import HealthData, DiabetesData
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# kind -> (model, exported columns)
+EXPORTS = {
+    'health': (HealthData, ('timestamp', 'blood_pressure', 'systolic', 'diastolic', 'heart_rate', 'temperature', 'weight', 'cholesterol', 'st_depression', 'risk_score')),
+    'diabetes': (DiabetesData, ('timestamp', 'gender', 'age', 'hypertension', 'heart_disease', 'smoking_history',
+                                'bmi', 'hba1c_level', 'blood_glucose_level', 'risk_score')),
+}
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _csv_chunk(rows, header=None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_value(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+def _ndjson_chunk(rows, columns):
+    return ''.join(json.dumps(dict(zip(columns, map(_value, row)))) + '\n' for row in rows)
+
+def export_readings(kind, user_id, fmt='csv', start=None, end=None):
+    """
+    Stream a user's readings oldest-first as CSV or NDJSON text chunks.
+
+    Rows are read as plain column tuples through a server-side cursor
+    (yield_per), one chunk per batch, so memory stays flat regardless of
+    history length. start/end (datetimes) bound the range on the
+    (user_id, timestamp) index.
+    """
+    model, columns = EXPORTS[kind]
+    query = select(*(getattr(model, c) for c in columns)).where(model.user_id == user_id)
+    if start is not None:
+        query = query.where(model.timestamp >= start)
+    if end is not None:
+        query = query.where(model.timestamp < end)
+    query = query.order_by(model.timestamp).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    if fmt == 'csv':
+        yield _csv_chunk([], header=columns)
+    result = db.session.execute(query)
+    try:
+        for rows in result.partitions():
+            yield _csv_chunk(rows) if fmt == 'csv' else _ndjson_chunk(rows, columns)
+    finally:
+        result.close()
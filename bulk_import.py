@@ -0,0 +1,205 @@
+import csv
+import json
+import os
+from datetime import datetime
+from sqlalchemy import insert
+from app import db
+from models import HealthData, DiabetesData
+from model_registry import registry as model_registry
+from utils import (DIABETES_SCHEMA, DIABETES_RECORD_FIELDS, DIABETES_RECORD_DEFAULTS, HEALTH_RECORD_FIELDS,
+                   HEALTH_RECORD_DEFAULTS, validate_record)
+
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 1000))
+# Per-row errors beyond this are counted but not listed in the report
+IMPORT_MAX_REPORTED_ERRORS = int(os.getenv('IMPORT_MAX_REPORTED_ERRORS', 1000))
+
+FORMATS = ('csv', 'ndjson')
+
+def detect_format(filename=None, mimetype=None):
+    """
+    Guess csv or ndjson from a file name or content type, defaulting to csv
+    """
+    name = (filename or '').lower()
+    mimetype = (mimetype or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in mimetype or 'jsonl' in mimetype:
+        return 'ndjson'
+    return 'csv'
+
+def iter_rows(stream, fmt):
+    """
+    Lazily parse a binary stream into (line number, dict) pairs.
+    Rows that can't be parsed, including rows with bytes that aren't valid
+    UTF-8, are yielded as (line number, Exception).
+    """
+    bad_lines = set()
+
+    def decode():
+        # Decoded line by line so one bad byte fails only its own row
+        for line_num, line in enumerate(stream, start=1):
+            try:
+                yield line.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                bad_lines.add(line_num)
+                yield line.decode('utf-8', errors='replace')
+
+    lines = decode()
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        last_line = 1
+        for row in reader:
+            # A quoted field may span several physical lines
+            first_line, last_line = last_line + 1, reader.line_num
+            if bad_lines and any(n in bad_lines for n in range(first_line, last_line + 1)):
+                yield last_line, ValueError("Row is not valid UTF-8 text")
+                continue
+            # Empty cells are treated as missing values
+            yield last_line, {k.strip(): (v.strip() or None) if isinstance(v, str) else v
+                              for k, v in row.items() if k}
+    elif fmt == 'ndjson':
+        for line_num, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            if line_num in bad_lines:
+                yield line_num, ValueError("Line is not valid UTF-8 text")
+                continue
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("Expected a JSON object")
+                yield line_num, row
+            except ValueError as e:
+                yield line_num, e
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+def _timestamp(row):
+    value = row.get('timestamp')
+    if value is None:
+        return datetime.utcnow()
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+def health_row(user_id, row):
+    """
+    Validate a health reading against utils.HEALTH_SCHEMA and build its insert values
+    """
+    values = validate_record(row, HEALTH_RECORD_FIELDS, defaults=HEALTH_RECORD_DEFAULTS)
+    return {
+        'user_id': user_id,
+        'age': values['age'],
+        'blood_pressure': row['blood_pressure'],
+        'systolic': values['systolic'],
+        'diastolic': values['diastolic'],
+        'heart_rate': values['heart_rate'],
+        'temperature': values['temperature'],
+        'weight': values['weight'],
+        'cholesterol': values['cholesterol'],
+        'st_depression': values['st_depression'],
+        'timestamp': _timestamp(row)
+    }
+
+def diabetes_row(user_id, row):
+    """
+    Validate a diabetes reading against utils.DIABETES_SCHEMA and build its insert values
+    """
+    values = validate_record(row, DIABETES_RECORD_FIELDS, DIABETES_SCHEMA, DIABETES_RECORD_DEFAULTS)
+    return {
+        'user_id': user_id,
+        'gender': values['gender'],
+        'age': values['age'],
+        'hypertension': bool(values['hypertension']),
+        'heart_disease': bool(values['heart_disease']),
+        'smoking_history': values['smoking_history'],
+        'bmi': values['bmi'],
+        'hba1c_level': values['hba1c_level'],
+        'blood_glucose_level': values['blood_glucose_level'],
+        'timestamp': _timestamp(row)
+    }
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors)
+        }
+
+def _flush(table, model_module, chunk, report):
+    """
+    Score a chunk of validated rows in one vectorized call and insert the
+    valid ones in a single transaction
+    """
+    lines, records, values = zip(*chunk)
+    features, valid, errors = model_module.encode_batch(list(records))
+    for index, message in errors:
+        report.error(lines[index], message)
+
+    rows = []
+    for index, risk_score in zip(valid, model_module.score_batch(features)):
+        row = values[index]
+        row['risk_score'] = risk_score
+        row['model_version'] = model_module.MODEL_VERSION
+        rows.append(row)
+
+    if rows:
+        try:
+            db.session.execute(insert(table), rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for index in valid:
+                report.error(lines[index], f"Database error: {str(e)}")
+            return
+    report.imported += len(rows)
+
+def import_readings(kind, user_id, stream, fmt='csv', chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Stream-import readings for a user from a CSV or NDJSON byte stream
+
+    Args:
+        kind (str): 'health' or 'diabetes'
+        user_id (int): Owner of the imported readings
+        stream: Binary file-like object or iterable of byte lines
+        fmt (str): 'csv' or 'ndjson'
+        chunk_size (int): Rows scored and committed per transaction
+
+    Returns:
+        dict: imported and failed counts plus per-row errors by line number
+    """
+    if kind == 'health':
+        table, build_row, model_module = HealthData, health_row, model_registry.get('heart')
+    elif kind == 'diabetes':
+        table, build_row, model_module = DiabetesData, diabetes_row, model_registry.get('diabetes')
+    else:
+        raise ValueError(f"Unknown import kind: {kind}")
+
+    report = ImportReport()
+    chunk = []
+    for line, row in iter_rows(stream, fmt):
+        if isinstance(row, Exception):
+            report.error(line, f"Could not parse row: {str(row)}")
+            continue
+        try:
+            values = build_row(user_id, row)
+        except (KeyError, TypeError, ValueError) as e:
+            report.error(line, str(e) if not isinstance(e, KeyError) else f"Missing field: {e.args[0]}")
+            continue
+        chunk.append((line, row, values))
+        if len(chunk) >= chunk_size:
+            _flush(table, model_module, chunk, report)
+            chunk = []
+    if chunk:
+        _flush(table, model_module, chunk, report)
+    return report.to_dict()
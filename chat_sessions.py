@@ -0,0 +1,111 @@
+import os
+from cache import TTLCache
+
+CHAT_SESSION_MAX = int(os.getenv('CHAT_SESSION_MAX', 5000))
+CHAT_SESSION_IDLE_TTL = float(os.getenv('CHAT_SESSION_IDLE_TTL', 1800))
+CHAT_HISTORY_MAX_TOKENS = int(os.getenv('CHAT_HISTORY_MAX_TOKENS', 2000))
+CHAT_SUMMARY_MAX_CHARS = int(os.getenv('CHAT_SUMMARY_MAX_CHARS', 600))
+
+def estimate_tokens(text):
+    """
+    Rough token count (about 4 characters per token), good enough for budgeting
+    """
+    return len(text) // 4 + 1
+
+class SessionBackend:
+    """
+    Storage interface for chat sessions. A session is a dict with
+    'summary' (str or None) and 'turns' (list of {'role', 'parts'} messages).
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, session):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+class InMemorySessionBackend(SessionBackend):
+    """
+    Per-process LRU store. Every save restarts the entry's TTL, so the TTL
+    is an idle timeout; the LRU bound caps memory across many users.
+    """
+
+    def __init__(self, maxsize=CHAT_SESSION_MAX, idle_ttl=CHAT_SESSION_IDLE_TTL):
+        self._cache = TTLCache(maxsize, idle_ttl)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, session):
+        self._cache.set(key, session)
+
+    def delete(self, key):
+        self._cache.pop(key)
+
+    def stats(self):
+        return self._cache.stats()
+
+class ChatSessionStore:
+    """
+    Conversation history per (user id, domain), capped at max_tokens.
+    When the cap is exceeded the oldest exchanges are dropped and the user's
+    questions from them are folded into a short running summary.
+    """
+
+    def __init__(self, backend, max_tokens=CHAT_HISTORY_MAX_TOKENS, summary_max_chars=CHAT_SUMMARY_MAX_CHARS):
+        self.backend = backend
+        self.max_tokens = max_tokens
+        self.summary_max_chars = summary_max_chars
+
+    def get(self, user_id, domain):
+        """
+        Returns (summary, turns) for the session, or (None, []) if there is none
+        """
+        session = self.backend.get((user_id, domain))
+        if session is None:
+            return None, []
+        return session['summary'], list(session['turns'])
+
+    def append(self, user_id, domain, message, reply):
+        """
+        Record one exchange and trim the session to the token budget
+        """
+        summary, turns = self.get(user_id, domain)
+        turns += [
+            {"role": "user", "parts": [message]},
+            {"role": "model", "parts": [reply]}
+        ]
+
+        dropped = []
+        while len(turns) > 2 and sum(estimate_tokens(t['parts'][0]) for t in turns) > self.max_tokens:
+            dropped.append(turns[0]['parts'][0])
+            turns = turns[2:]
+        if dropped:
+            summary = self._summarize(summary, dropped)
+
+        self.backend.set((user_id, domain), {'summary': summary, 'turns': turns})
+
+    def _summarize(self, summary, questions):
+        """
+        Extend the running summary with questions from dropped exchanges,
+        keeping only the most recent summary_max_chars characters
+        """
+        text = '; '.join(q.strip() for q in questions)
+        summary = f"{summary}; {text}" if summary else text
+        if len(summary) > self.summary_max_chars:
+            summary = '...' + summary[-(self.summary_max_chars - 3):]
+        return summary
+
+    def clear(self, user_id, domain):
+        self.backend.delete((user_id, domain))
+
+    def stats(self):
+        return self.backend.stats()
+
+session_store = ChatSessionStore(InMemorySessionBackend())
@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from model_store import ARTIFACT_DIR, file_hash
+
+logger = logging.getLogger(__name__)
+
+DATASET_CACHE_DIR = os.getenv('DATASET_CACHE_DIR', os.path.join(ARTIFACT_DIR, 'datasets'))
+# Cache directories are named <dataset name>-<first 16 hex digits of its SHA-256>
+DIGEST_LENGTH = 16
+
+def _dataset_name(dataset_path):
+    return os.path.splitext(os.path.basename(dataset_path))[0]
+
+def cache_path(dataset_path, digest):
+    return os.path.join(DATASET_CACHE_DIR, f"{_dataset_name(dataset_path)}-{digest[:DIGEST_LENGTH]}")
+
+def _typed_columns(df):
+    """
+    Narrow a freshly parsed CSV: strings become categorical codes and integer
+    columns the smallest integer type that holds them. Floats stay float64 so
+    models trained from the cache see exactly the values read_csv produced.
+    """
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        if pd.api.types.is_integer_dtype(column):
+            column = pd.to_numeric(column, downcast='integer')
+        elif not pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            column = column.astype('category')
+        columns[name] = column
+    return columns
+
+def _write_cache(df, path):
+    """
+    Write one .npy file per column plus meta.json into a temporary directory
+    and rename it into place, so readers never see a partial cache
+    """
+    os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=DATASET_CACHE_DIR, prefix='.tmp-')
+    try:
+        meta = {'rows': len(df), 'columns': []}
+        for i, (name, column) in enumerate(_typed_columns(df).items()):
+            entry = {'name': name, 'file': f"{i}.npy"}
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                entry['categories'] = [str(c) for c in column.cat.categories]
+                values = column.cat.codes.to_numpy()
+            else:
+                values = column.to_numpy()
+            np.save(os.path.join(tmp_dir, entry['file']), values, allow_pickle=False)
+            meta['columns'].append(entry)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        os.chmod(tmp_dir, 0o755)
+        os.replace(tmp_dir, path)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        # Another process may have written the same cache first
+        if not os.path.isdir(path):
+            raise
+
+def _read_cache(path):
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    columns = {}
+    for entry in meta['columns']:
+        values = np.load(os.path.join(path, entry['file']), mmap_mode='r', allow_pickle=False)
+        if 'categories' in entry:
+            columns[entry['name']] = pd.Categorical.from_codes(values, categories=entry['categories'])
+        else:
+            columns[entry['name']] = values
+    return pd.DataFrame(columns, copy=False)
+
+def _remove_stale(dataset_path, current):
+    """
+    Remove older caches of the same dataset. Names are matched exactly, so
+    clearing 'heart' leaves e.g. 'heart-2020' caches alone.
+    """
+    pattern = re.compile(re.escape(_dataset_name(dataset_path)) + f"-[0-9a-f]{{{DIGEST_LENGTH}}}")
+    for entry in os.listdir(DATASET_CACHE_DIR):
+        path = os.path.join(DATASET_CACHE_DIR, entry)
+        if pattern.fullmatch(entry) and path != current and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+def load_dataset(dataset_path):
+    """
+    Load a training CSV through a typed columnar cache
+
+    The first load parses the CSV and stores each column as a .npy file,
+    string columns as categorical codes. Later loads memory-map those files
+    instead of parsing. The cache is keyed on the CSV's SHA-256, so editing
+    the file invalidates it.
+
+    Args:
+        dataset_path (str): Path to the training CSV
+
+    Returns:
+        pd.DataFrame: The dataset with integer, float64 and categorical columns
+    """
+    path = cache_path(dataset_path, file_hash(dataset_path))
+    if os.path.isdir(path):
+        try:
+            return _read_cache(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable dataset cache {path}: {str(e)}")
+            shutil.rmtree(path, ignore_errors=True)
+
+    df = pd.read_csv(dataset_path)
+    try:
+        _write_cache(df, path)
+        _remove_stale(dataset_path, path)
+        logger.info(f"Cached {dataset_path} as typed columns in {path}")
+        return _read_cache(path)
+    except OSError as e:
+        logger.warning(f"Could not cache {dataset_path}: {str(e)}")
+        return pd.DataFrame(_typed_columns(df))
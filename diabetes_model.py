@@ -1,29 +1,87 @@
+import os
+import threading
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
+from model_store import load_or_train
+from model_training import DIABETES_DATASET, DIABETES_PARAMS, train_diabetes_model
+from forest_engine import FlatForest
+from cache import prediction_caches
+from metrics import inference_span
+from utils import DIABETES_SCHEMA, validate_record, validate_columns
 
-# Load and prepare the diabetes prediction model
-diabetes_data = pd.read_csv('diabetes_prediction_dataset.csv')
-X = diabetes_data[['age', 'bmi', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease', 'smoking_history']]
+# Inference engine for the RandomForest:
+#   sklearn - diabetes_model.predict_proba (reference implementation)
+#   flat    - forest_engine.FlatForest vectorized over flat node arrays
+#   auto    - flat for batches up to FLAT_FOREST_MAX_BATCH rows, sklearn above
+INFERENCE_ENGINE = os.getenv('DIABETES_INFERENCE_ENGINE', 'sklearn')
+FLAT_FOREST_MAX_BATCH = int(os.getenv('FLAT_FOREST_MAX_BATCH', 256))
+if INFERENCE_ENGINE not in ('sklearn', 'flat', 'auto'):
+    raise ValueError(f"Unknown DIABETES_INFERENCE_ENGINE: {INFERENCE_ENGINE}")
 
-# Convert smoking_history to numeric using one-hot encoding
-X = pd.get_dummies(X, columns=['smoking_history'], prefix='smoking')
+# Load the persisted model, training it only if no artifact exists yet
+_bundle = load_or_train('diabetes', DIABETES_DATASET, DIABETES_PARAMS, train_diabetes_model)
+diabetes_scaler = _bundle['scaler']
+diabetes_model = _bundle['model']
+feature_columns = _bundle['feature_columns']
+MODEL_VERSION = _bundle['version']
 
-y = diabetes_data['diabetes']
+if 'flat_forest' in _bundle:
+    flat_forest = FlatForest(**_bundle['flat_forest'])
+else:
+    flat_forest = FlatForest.from_sklearn(diabetes_model)
 
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-diabetes_scaler = StandardScaler()
-X_train_scaled = diabetes_scaler.fit_transform(X_train)
-X_test_scaled = diabetes_scaler.transform(X_test)
+# Get the smoking history categories from the training data
+smoking_categories = [col.replace('smoking_', '') for col in feature_columns if col.startswith('smoking_')]
 
-diabetes_model = RandomForestClassifier(random_state=42)
-diabetes_model.fit(X_train_scaled, y_train)
+# Column position of every model feature, built once so rows can be encoded
+# straight into a NumPy matrix in training column order
+NUMERIC_FEATURES = [
+    # (request key validated against utils.DIABETES_SCHEMA, training column)
+    ('age', 'age'),
+    ('bmi', 'bmi'),
+    ('hba1c_level', 'HbA1c_level'),
+    ('blood_glucose_level', 'blood_glucose_level'),
+    ('hypertension', 'hypertension'),
+    ('heart_disease', 'heart_disease')
+]
+FEATURE_FIELDS = [key for key, col in NUMERIC_FEATURES]
+column_index = {col: i for i, col in enumerate(feature_columns)}
+numeric_index = [(key, column_index[col]) for key, col in NUMERIC_FEATURES]
+numeric_columns = [idx for key, idx in numeric_index]
+smoking_index = {category: column_index[f'smoking_{category}'] for category in smoking_categories}
 
-# Get the smoking history categories from the training data
-smoking_categories = [col.replace('smoking_', '') for col in X.columns if col.startswith('smoking_')]
+_local = threading.local()
+_cache = prediction_caches['diabetes']
+
+def _row_buffer():
+    row = getattr(_local, 'row', None)
+    if row is None:
+        row = _local.row = np.zeros((1, len(feature_columns)), dtype=np.float64)
+    return row
 
+def _encode_record(data, row):
+    """
+    Validate one record and write its features into a preallocated float64 row
+    """
+    values = validate_record(data, FEATURE_FIELDS, DIABETES_SCHEMA)
+    smoking = data.get('smoking_history')
+    if smoking is None:
+        raise ValueError("Smoking history is required")
+    for key, idx in numeric_index:
+        row[idx] = values[key]
+    idx = smoking_index.get(smoking)
+    if idx is not None:
+        row[idx] = 1.0
+
+def _scale(features):
+    return (features - diabetes_scaler.mean_) / diabetes_scaler.scale_
+
+def _predict_proba(features_scaled):
+    if INFERENCE_ENGINE == 'flat' or (INFERENCE_ENGINE == 'auto' and len(features_scaled) <= FLAT_FOREST_MAX_BATCH):
+        return flat_forest.predict_proba(features_scaled)
+    return diabetes_model.predict_proba(features_scaled)
+
+@inference_span('diabetes')
 def predict_diabetes_risk(data):
     """
     Predict diabetes risk based on input features
@@ -41,6 +99,29 @@ def predict_diabetes_risk(data):
     Returns:
         float: Probability of diabetes (risk score between 0 and 1)
     """
+    try:
+        # Encode straight into this thread's preallocated row, in training column order
+        row = _row_buffer()
+        row.fill(0.0)
+        _encode_record(data, row[0])
+
+        # Identical encoded features under the same model version give the same score
+        cache_key = (MODEL_VERSION, *row[0].tolist())
+        risk_score = _cache.get(cache_key)
+        if risk_score is None:
+            # Scale with the stored scaler statistics and predict
+            risk_score = float(_predict_proba(_scale(row))[0][1])
+            _cache.set(cache_key, risk_score)
+
+        return risk_score
+    except Exception as e:
+        raise Exception(f"Error predicting diabetes risk: {str(e)}")
+
+def _predict_diabetes_risk_dataframe(data):
+    """
+    Reference implementation of predict_diabetes_risk that goes through a
+    one-row DataFrame and the fitted scaler. Kept for parity checks and benchmarks.
+    """
     try:
         # Create feature array with zeros for smoking categories
         feature_dict = {
@@ -59,7 +140,7 @@ def predict_diabetes_risk(data):
 
         # Convert to DataFrame to ensure correct feature order
         features_df = pd.DataFrame([feature_dict])
-        features_df = features_df.reindex(columns=X.columns, fill_value=0)
+        features_df = features_df.reindex(columns=feature_columns, fill_value=0)
 
         # Scale features and predict
         features_scaled = diabetes_scaler.transform(features_df)
@@ -67,4 +148,62 @@ def predict_diabetes_risk(data):
 
         return float(risk_score)
     except Exception as e:
-        raise Exception(f"Error predicting diabetes risk: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error predicting diabetes risk: {str(e)}")
+
+def encode_batch(records):
+    """
+    Validate and encode records into a feature matrix, skipping invalid ones
+
+    Returns:
+        tuple: (features, valid, errors) where features has one row per valid
+        record, valid lists their indexes in records, and errors is a list of
+        (index, message) for the rest
+    """
+    values, valid, errors = validate_columns(records, FEATURE_FIELDS, DIABETES_SCHEMA)
+
+    smoking = pd.Series(np.fromiter((data.get('smoking_history') for data in records), dtype=object, count=len(records)))
+    missing = valid & smoking.isna().to_numpy()
+    if missing.any():
+        errors = sorted(errors + [(int(i), "Smoking history is required") for i in np.flatnonzero(missing)])
+        valid &= ~missing
+
+    features = np.zeros((int(valid.sum()), len(feature_columns)), dtype=np.float64)
+    features[:, numeric_columns] = values.loc[valid, FEATURE_FIELDS].to_numpy(dtype=np.float64)
+    # One-hot smoking history; unknown categories leave every smoking column at 0
+    smoking_columns = smoking[valid].map(smoking_index).to_numpy(dtype=np.float64, na_value=np.nan)
+    known = ~np.isnan(smoking_columns)
+    features[np.flatnonzero(known), smoking_columns[known].astype(np.intp)] = 1.0
+    return features, np.flatnonzero(valid).tolist(), errors
+
+@inference_span('diabetes')
+def score_batch(features):
+    """
+    Score an encoded feature matrix from encode_batch
+    Returns a list of risk scores between 0 and 1
+    """
+    if len(features) == 0:
+        return []
+    try:
+        return _predict_proba(_scale(features))[:, 1].tolist()
+    except Exception as e:
+        raise Exception(f"Error predicting diabetes risk: {str(e)}")
+
+@inference_span('diabetes')
+def predict_diabetes_risk_batch(records):
+    """
+    Predict diabetes risk for many records with a single model call
+
+    Args:
+        records (list): List of dicts with the same keys as predict_diabetes_risk
+
+    Returns:
+        list: Risk scores between 0 and 1, in the same order as records
+
+    Raises:
+        ValueError: If any record is missing a value or has an invalid one
+    """
+    features, valid, errors = encode_batch(records)
+    if errors:
+        index, message = errors[0]
+        raise ValueError(f"Invalid record at index {index}: {message}")
+    return score_batch(features)
\ No newline at end of file
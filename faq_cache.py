@@ -0,0 +1,100 @@
+import os
+import re
+import threading
+from cache import TTLCache
+
+FAQ_CACHE_SIZE = int(os.getenv('FAQ_CACHE_SIZE', 2048))
+FAQ_CACHE_TTL = float(os.getenv('FAQ_CACHE_TTL', 24 * 3600))
+
+# Only definitional questions are shared between users: "what is ...",
+# "what does ... mean" and "normal range for ...". Anything else may depend
+# on who is asking or on what was said before.
+DEFINITIONAL_PATTERN = re.compile(
+    r"^(what is|what's|whats|what are) (a |an |the )?\S"
+    r"|^what does .+ mean$"
+    r"|^(what is |what's |whats |what are )?(the |a )?(normal|healthy|typical|ideal|recommended) (range|ranges|level|levels|value|values) (for|of) \S"
+)
+
+# Anything that points at the user, a patient or third person, their
+# records, or earlier turns makes the answer depend on who is asking
+PERSONAL_PATTERN = re.compile(
+    r"\b(i|i'm|im|i've|ive|i'd|me|my|mine|myself|we|our|us|you|your)\b"
+    r"|\b(he|him|his|he's|she|her|hers|she's|they|them|their|theirs|patient|patient's|patients|person|child's|husband|wife|son|daughter|mother|father|mom|dad)\b"
+    r"|\b(latest|recent|last|current|reading|readings|record|records|recorded|data|result|results|score|scores|trend)\b"
+    r"|\b(it|that|this|those|these|above|previous|earlier|again|also|too|else|instead|then|same)\b"
+    r"|\b\d"
+)
+# Openers that continue an earlier question
+FOLLOW_UP_PATTERN = re.compile(r"^(and|but|so|or|also|what about|how about|and what|what if|why|ok|okay)\b")
+FILLER_PATTERN = re.compile(
+    r"^(hi|hello|hey|please|thanks|thank you|quick question|can you|could you|would you|tell me|explain)\b[\s,]*"
+)
+
+def normalize_question(text):
+    """
+    Lowercase, drop punctuation and greetings, and collapse whitespace so
+    trivially different phrasings share a cache key
+    """
+    text = text.lower().replace('’', "'")
+    text = re.sub(r"[^\w\s'%/-]", ' ', text)
+    text = ' '.join(text.split())
+    while True:
+        stripped = FILLER_PATTERN.sub('', text)
+        if stripped == text:
+            return text
+        text = stripped
+
+def is_context_independent(text):
+    """
+    True for generic questions whose answer doesn't depend on the user's data
+    or the conversation so far, e.g. "What is a normal HbA1c?". Deliberately
+    conservative: a question that isn't clearly definitional is personal.
+    """
+    normalized = normalize_question(text)
+    if len(normalized.split()) < 3:
+        return False
+    if FOLLOW_UP_PATTERN.search(normalized) or PERSONAL_PATTERN.search(normalized):
+        return False
+    return DEFINITIONAL_PATTERN.search(normalized) is not None
+
+class FAQCache:
+    """
+    Answers to context-independent questions, keyed on (domain, normalized question).
+    Only the first turn of a conversation is eligible, so the hit rate is
+    bounded by how often conversations open with a generic question;
+    stats() counts the later-turn questions skipped as bypassed_history.
+    """
+
+    def __init__(self, maxsize=FAQ_CACHE_SIZE, ttl=FAQ_CACHE_TTL):
+        self._cache = TTLCache(maxsize, ttl)
+        self._lock = threading.Lock()
+        self.bypassed = 0
+        self.bypassed_history = 0
+
+    def key(self, domain, message, has_history=False):
+        """
+        Cache key for a question, or None if the question must not be cached.
+        Pass has_history=True when the chat session already has turns: a
+        question may then lean on them even if it reads as generic.
+        """
+        if has_history or not is_context_independent(message):
+            with self._lock:
+                self.bypassed += 1
+                if has_history:
+                    self.bypassed_history += 1
+            return None
+        return (domain, normalize_question(message))
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, answer):
+        self._cache.set(key, answer)
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats['bypassed'] = self.bypassed
+        stats['bypassed_history'] = self.bypassed_history
+        return stats
+
+faq_cache = FAQCache()
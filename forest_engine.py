@@ -0,0 +1,109 @@
+import numpy as np
+
+class FlatForest:
+    """
+    Vectorized inference for a fitted sklearn RandomForestClassifier.
+
+    All trees are packed into flat node arrays with global node ids, so a batch
+    of rows is routed through every tree at once with NumPy fancy indexing
+    instead of walking each estimator separately. Leaves point to themselves,
+    and leaf values are stored as class probabilities.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.is_leaf = left == np.arange(len(left))
+        # children[node, 1] is taken when the split test passes, as in sklearn
+        self.children = np.stack([right, left], axis=1)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """
+        Export forest.estimators_ into flat arrays
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes)
+            leaf = tree.children_left == -1
+
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(leaf, node_ids, tree.children_right + offset))
+
+            # Match DecisionTreeClassifier.predict_proba: normalize each leaf
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max_depth
+        )
+
+    def to_arrays(self):
+        """
+        Plain dict of arrays, suitable for storing in a model artifact
+        """
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'left': self.left,
+            'right': self.right,
+            'value': self.value,
+            'roots': self.roots,
+            'max_depth': self.max_depth
+        }
+
+    def apply(self, X):
+        """
+        Return the leaf node id reached in every tree, shape (n_rows, n_trees)
+        """
+        # sklearn trees compare float32 feature values against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_trees = X.shape[0], len(self.roots)
+
+        # Offset of each (row, tree) pair's row in the flattened feature matrix
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * X.shape[1], n_trees)
+        nodes = np.tile(self.roots, n_rows)
+        X_flat = X.ravel()
+
+        # Only advance (row, tree) pairs that have not reached a leaf yet
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        for _ in range(self.max_depth):
+            if active.size == 0:
+                break
+            node = nodes[active]
+            go_left = X_flat[row_offsets[active] + self.feature[node]] <= self.threshold[node]
+            node = self.children[node, go_left.view(np.int8)]
+            nodes[active] = node
+            active = active[~self.is_leaf[node]]
+
+        return nodes.reshape(n_rows, n_trees)
+
+    def predict_proba(self, X):
+        """
+        Average leaf class probabilities over all trees, shape (n_rows, n_classes)
+        """
+        leaves = self.apply(X)
+        return self.value[leaves].mean(axis=1)
@@ -0,0 +1,9 @@
+import os
+
+# Threaded workers: a streaming chat response holds a thread, not a whole worker,
+# while the LLM call runs on the app's own LLM pool (see llm_client.py)
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', 2))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
@@ -1,31 +1,161 @@
 
+from sqlalchemy import func, true, tuple_
 from models import User, HealthData, DiabetesData
 from app import db
 
-def get_user_health_data(user_id):
+HEALTH_SUMMARY_METRICS = ('systolic', 'diastolic', 'heart_rate', 'temperature', 'weight', 'cholesterol', 'risk_score')
+DIABETES_SUMMARY_METRICS = ('age', 'bmi', 'hba1c_level', 'blood_glucose_level', 'risk_score')
+
+# Metrics returned per bucket by the downsampled history series
+HEALTH_SERIES_METRICS = ('systolic', 'diastolic', 'heart_rate', 'risk_score')
+DIABETES_SERIES_METRICS = ('blood_glucose_level', 'hba1c_level', 'bmi', 'risk_score')
+
+SERIES_RESOLUTIONS = ('day', 'week', 'month')
+# Upper bound on buckets per series; the newest ones are kept
+SERIES_MAX_BUCKETS = 1000
+
+# SQLite has no date_trunc; these give the same bucket start dates
+SQLITE_BUCKETS = {
+    'day': lambda column: func.date(column),
+    'week': lambda column: func.date(column, 'weekday 0', '-6 days'),  # Monday
+    'month': lambda column: func.date(column, 'start of month')
+}
+
+def _aggregates(model, metrics):
+    """
+    count plus min/max/avg columns for each metric, labelled <metric>_min etc.
+    """
+    aggregates = [func.count(model.id).label('count')]
+    for metric in metrics:
+        column = getattr(model, metric)
+        aggregates += [
+            func.min(column).label(f'{metric}_min'),
+            func.max(column).label(f'{metric}_max'),
+            func.avg(column).label(f'{metric}_avg')
+        ]
+    return aggregates
+
+def _summary_row(model, user_id, metrics):
+    """
+    Fetch the latest row together with count and min/max/avg per metric
+    in a single query: the latest row cross-joined with a one-row aggregate
+    Returns (latest, aggregates mapping) or (None, None) if the user has no data
+    """
+    stats = db.session.query(*_aggregates(model, metrics)).filter(model.user_id == user_id).subquery()
+
+    row = db.session.query(model, stats)\
+        .join(stats, true())\
+        .filter(model.user_id == user_id)\
+        .order_by(model.timestamp.desc(), model.id.desc())\
+        .limit(1)\
+        .first()
+    if row is None:
+        return None, None
+    return row[0], row._mapping
+
+def _summary_stats(aggregates, metrics):
+    return {
+        metric: {
+            'min': aggregates[f'{metric}_min'],
+            'max': aggregates[f'{metric}_max'],
+            'avg': float(aggregates[f'{metric}_avg']) if aggregates[f'{metric}_avg'] is not None else None
+        }
+        for metric in metrics
+    }
+
+def _bucket_start(column, resolution):
+    """
+    SQL expression for the start of the day/week/month containing column
+    """
+    if resolution not in SERIES_RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(SERIES_RESOLUTIONS)}")
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        return func.date_trunc(resolution, column)
+    if dialect == 'sqlite':
+        return SQLITE_BUCKETS[resolution](column)
+    raise ValueError(f"Downsampled history is not supported on {dialect}")
+
+def _series(model, user_id, metrics, resolution, start=None):
+    """
+    Bucket a user's readings by day, week or month in SQL
+    Returns a list oldest-first of {'bucket', 'count', <metric>: {'min', 'max', 'avg'}}
     """
-    Get all health data entries for a specific user
+    bucket = _bucket_start(model.timestamp, resolution).label('bucket')
+    query = db.session.query(bucket, *_aggregates(model, metrics)).filter(model.user_id == user_id)
+    if start is not None:
+        query = query.filter(model.timestamp >= start)
+    rows = query.group_by(bucket).order_by(bucket.desc()).limit(SERIES_MAX_BUCKETS).all()
+
+    series = []
+    for row in reversed(rows):
+        aggregates = row._mapping
+        # date_trunc returns a datetime, SQLite's date() an ISO string
+        start_of_bucket = aggregates['bucket']
+        point = {
+            'bucket': start_of_bucket.date().isoformat() if hasattr(start_of_bucket, 'date') else str(start_of_bucket),
+            'count': aggregates['count']
+        }
+        point.update(_summary_stats(aggregates, metrics))
+        series.append(point)
+    return series
+
+def get_health_data_series(user_id, resolution, start=None):
+    """
+    Downsampled health history: min/max/avg per day, week or month since start
+    """
+    return _series(HealthData, user_id, HEALTH_SERIES_METRICS, resolution, start)
+
+def get_diabetes_data_series(user_id, resolution, start=None):
+    """
+    Downsampled diabetes history: min/max/avg per day, week or month since start
+    """
+    return _series(DiabetesData, user_id, DIABETES_SERIES_METRICS, resolution, start)
+
+def _history_page(model, user_id, before, limit):
+    """
+    A user's rows newest first, ordered by (timestamp, id) so rows sharing a
+    timestamp keep a stable order across pages. before is a (timestamp, id)
+    cursor; an id of None pages by timestamp alone.
+    """
+    query = model.query.filter_by(user_id=user_id)
+    if before is not None:
+        timestamp, row_id = before
+        if row_id is None:
+            query = query.filter(model.timestamp < timestamp)
+        else:
+            query = query.filter(tuple_(model.timestamp, model.id) < tuple_(timestamp, row_id))
+    query = query.order_by(model.timestamp.desc(), model.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+def get_user_health_data(user_id, before=None, limit=None):
+    """
+    Get health data entries for a specific user, newest first
+    Pass before ((timestamp, id) of the last row seen) and limit to page through history by keyset
     Returns a list of HealthData objects
     """
-    return HealthData.query.filter_by(user_id=user_id).order_by(HealthData.timestamp.desc()).all()
+    return _history_page(HealthData, user_id, before, limit)
 
 def get_latest_health_data(user_id):
     """
     Get the most recent health data entry for a specific user
     Returns a single HealthData object or None
     """
-    return HealthData.query.filter_by(user_id=user_id).order_by(HealthData.timestamp.desc()).first()
+    return HealthData.query.filter_by(user_id=user_id).order_by(HealthData.timestamp.desc(), HealthData.id.desc()).first()
 
 def get_health_data_summary(user_id): # return the health data based on user id
 
-    data = get_user_health_data(user_id)
-    if not data:
+    latest, aggregates = _summary_row(HealthData, user_id, HEALTH_SUMMARY_METRICS)
+    if latest is None:
         return None
-    
-    latest = data[0]
+
     return {
         'latest': {
             'blood_pressure': latest.blood_pressure,
+            'systolic': latest.systolic,
+            'diastolic': latest.diastolic,
             'heart_rate': latest.heart_rate,
             'temperature': latest.temperature,
             'weight': latest.weight,
@@ -33,23 +163,31 @@ def get_health_data_summary(user_id): # return the health data based on user id
             'timestamp': latest.timestamp,
             'cholesterol': latest.cholesterol
         },
-        'count': len(data)
+        'count': aggregates['count'],
+        'stats': _summary_stats(aggregates, HEALTH_SUMMARY_METRICS)
     }
 
-def get_user_diabetes_data(user_id):
+def get_user_diabetes_data(user_id, before=None, limit=None):
     """
-    Get all health data entries for a specific user
-    Returns a list of HealthData objects
+    Get diabetes data entries for a specific user, newest first
+    Pass before ((timestamp, id) of the last row seen) and limit to page through history by keyset
+    Returns a list of DiabetesData objects
     """
-    return DiabetesData.query.filter_by(user_id=user_id).order_by(DiabetesData.timestamp.desc()).all()
+    return _history_page(DiabetesData, user_id, before, limit)
+
+def get_latest_diabetes_data(user_id):
+    """
+    Get the most recent diabetes data entry for a specific user
+    Returns a single DiabetesData object or None
+    """
+    return DiabetesData.query.filter_by(user_id=user_id).order_by(DiabetesData.timestamp.desc(), DiabetesData.id.desc()).first()
 
 def get_diabetes_data_summary(user_id):
 
-    data = get_user_diabetes_data(user_id)
-    if not data:
+    latest, aggregates = _summary_row(DiabetesData, user_id, DIABETES_SUMMARY_METRICS)
+    if latest is None:
         return None
-    
-    latest = data[0]
+
     return {
         'latest': {
             'gender': latest.gender,
@@ -63,5 +201,6 @@ def get_diabetes_data_summary(user_id):
             'risk_score': latest.risk_score,
             'timestamp': latest.timestamp
         },
-        'count': len(data)
+        'count': aggregates['count'],
+        'stats': _summary_stats(aggregates, DIABETES_SUMMARY_METRICS)
     }
\ No newline at end of file
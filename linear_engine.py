@@ -0,0 +1,27 @@
+import numpy as np
+from scipy.special import expit
+
+class LinearRiskScorer:
+    """
+    Closed-form scorer for a StandardScaler + binary LogisticRegression pair.
+
+    The scaler is folded into the coefficients once, so scoring is the sigmoid
+    of a single dot product: w = coef / scale, b = intercept - sum(coef * mean / scale).
+    """
+
+    def __init__(self, scaler, model):
+        coef = np.asarray(model.coef_[0], dtype=np.float64)
+        self.weights = coef / scaler.scale_
+        self.bias = float(model.intercept_[0] - np.sum(coef * scaler.mean_ / scaler.scale_))
+
+    def score(self, features):
+        """
+        Args:
+            features: A single row of 5 features, or an (N, 5) matrix
+
+        Returns:
+            float for a single row, or an (N,) array of risk scores
+        """
+        features = np.asarray(features, dtype=np.float64)
+        risk = expit(features @ self.weights + self.bias)
+        return float(risk) if features.ndim == 1 else risk
@@ -0,0 +1,375 @@
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# gemini (default) or fake, a local stand-in for tests and load runs
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini')
+LLM_MODEL = os.getenv('LLM_MODEL', 'gemini-pro')
+LLM_WORKERS = int(os.getenv('LLM_WORKERS', 8))
+FAKE_LLM_DELAY = float(os.getenv('FAKE_LLM_DELAY', 0))
+# Fraction of fake calls that fail, to exercise retries and the circuit breaker
+FAKE_LLM_FAILURE_RATE = float(os.getenv('FAKE_LLM_FAILURE_RATE', 0))
+
+# Resilience settings for LLMClient
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 8))
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', 2))
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 20))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 0.25))
+LLM_BREAKER_THRESHOLD = int(os.getenv('LLM_BREAKER_THRESHOLD', 5))
+LLM_BREAKER_COOLDOWN = float(os.getenv('LLM_BREAKER_COOLDOWN', 30))
+
+# Dedicated pool for LLM round trips, so streaming requests don't run the
+# slow network call on the request thread
+executor = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix='llm')
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def __iter__(self):
+        # Stream word by word, like the real API streams partial text
+        words = self.text.split(' ')
+        for i, word in enumerate(words):
+            if FAKE_LLM_DELAY:
+                time.sleep(FAKE_LLM_DELAY / len(words))
+            yield FakeResponse(word if i == 0 else ' ' + word)
+
+class FakeChat:
+    def __init__(self, model, history):
+        self.model = model
+        self.history = list(history or [])
+
+    def send_message(self, content, stream=False, **kwargs):
+        self.model.record_call()
+        if FAKE_LLM_DELAY and not stream:
+            time.sleep(FAKE_LLM_DELAY)
+        if FAKE_LLM_FAILURE_RATE and random.random() < FAKE_LLM_FAILURE_RATE:
+            raise ConnectionError("Fake LLM failure")
+        self.history.append(content if isinstance(content, dict) else {'role': 'user', 'parts': [content]})
+        parts = content['parts'] if isinstance(content, dict) else [content]
+        text = f"Fake response to: {parts[-1]}"
+        self.history.append({'role': 'model', 'parts': [text]})
+        return FakeResponse(text)
+
+class FakeModel:
+    """
+    Offline stand-in for genai.GenerativeModel. Counts round trips so tests
+    and benchmarks can assert how many calls a chat turn makes.
+    """
+
+    def __init__(self, model_name=LLM_MODEL):
+        self.model_name = model_name
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def start_chat(self, history=None):
+        return FakeChat(self, history)
+
+_model = None
+_model_lock = threading.Lock()
+
+def _create_model():
+    if LLM_BACKEND == 'fake':
+        return FakeModel()
+    if LLM_BACKEND != 'gemini':
+        raise ValueError(f"Unknown LLM_BACKEND: {LLM_BACKEND}")
+
+    import google.generativeai as genai
+    # Configure the Gemini API
+    genai.configure(api_key=os.getenv('GEMINI_API_KEY'),
+                    transport="rest",
+                    client_options={"api_endpoint": "generativelanguage.googleapis.com"})
+    return genai.GenerativeModel(LLM_MODEL)
+
+def get_model():
+    """
+    Return the process-wide chat model client for the configured backend,
+    creating it on first use
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _create_model()
+    return _model
+
+_DONE = object()
+
+def stream_in_pool(fn, *args, timeout=None):
+    """
+    Run generator function fn(*args) on the LLM pool and yield its items
+    on the calling thread as they arrive. Exceptions are re-raised here.
+
+    Raises TimeoutError if no item arrives within timeout seconds (default
+    LLM_TIMEOUT). Closing the returned generator, e.g. when the client
+    disconnects, stops the producer at its next item and closes fn's
+    generator on the pool thread.
+    """
+    timeout = LLM_TIMEOUT if timeout is None else timeout
+    items = queue.Queue()
+    cancelled = threading.Event()
+
+    def produce():
+        if cancelled.is_set():
+            # Never started: fn's generator and its arguments are dropped here
+            return
+        generator = fn(*args)
+        try:
+            for item in generator:
+                if cancelled.is_set():
+                    return
+                items.put(item)
+            items.put(_DONE)
+        except Exception as e:
+            items.put(e)
+        finally:
+            generator.close()
+
+    executor.submit(produce)
+    try:
+        while True:
+            try:
+                item = items.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No LLM output for {timeout:g}s")
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+
+class LLMUnavailable(Exception):
+    """
+    Raised without calling the model when the circuit breaker is open or
+    every concurrency slot stays busy past LLM_QUEUE_TIMEOUT
+    """
+
+def _is_retryable(error):
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        from google.api_core import exceptions as google_exceptions
+    except ImportError:
+        return False
+    return isinstance(error, (
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.TooManyRequests,
+        google_exceptions.InternalServerError
+    ))
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `cooldown` seconds, then lets a single trial call through (half-open);
+    its outcome closes the breaker or opens it again.
+    """
+
+    def __init__(self, threshold=LLM_BREAKER_THRESHOLD, cooldown=LLM_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = 'half_open'
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def abandon_trial(self):
+        """
+        The half-open trial call ended without an outcome (e.g. it was
+        cancelled); let the next call be the trial instead
+        """
+        with self._lock:
+            if self.state == 'half_open':
+                self.state = 'open'
+                self.opened_at = time.monotonic() - self.cooldown
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.threshold:
+                if self.state != 'open':
+                    self.trips += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+class LLMClient:
+    """
+    Wraps chat calls with a per-process concurrency cap, a deadline,
+    retries with jittered exponential backoff and a circuit breaker
+    """
+
+    def __init__(self, max_concurrency=LLM_MAX_CONCURRENCY, timeout=LLM_TIMEOUT,
+                 max_retries=LLM_MAX_RETRIES, backoff_base=LLM_BACKOFF_BASE, breaker=None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.counters = {'calls': 0, 'failures': 0, 'retries': 0, 'rejected_open': 0, 'rejected_busy': 0}
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            self.counters[name] += delta
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=LLM_QUEUE_TIMEOUT):
+            self._count('rejected_busy')
+            raise LLMUnavailable("Too many concurrent LLM requests")
+        if not self.breaker.allow():
+            self._slots.release()
+            self._count('rejected_open')
+            raise LLMUnavailable("LLM circuit breaker is open")
+        with self._lock:
+            self.in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _record_error(self, error):
+        """
+        Count a failed attempt. Only availability errors count toward the
+        breaker; a client error (a bad prompt, a blocked reply) still shows
+        the model is answering.
+        """
+        self._count('failures')
+        if _is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _backoff(self, attempt, deadline):
+        """
+        Sleep before the next attempt; returns False if it would pass the deadline
+        """
+        delay = random.uniform(0, self.backoff_base * (2 ** attempt))
+        if time.monotonic() + delay >= deadline:
+            return False
+        self._count('retries')
+        time.sleep(delay)
+        return True
+
+    def _attempts(self):
+        """
+        Yield attempt numbers until retries or the overall deadline run out
+        """
+        deadline = time.monotonic() + self.timeout
+        attempt = 0
+        while True:
+            yield attempt, max(deadline - time.monotonic(), 0.1)
+            attempt += 1
+            if attempt > self.max_retries or not self._backoff(attempt - 1, deadline):
+                return
+
+    def send(self, chat, content):
+        """
+        Send a message and return the full response text
+        """
+        self._acquire()
+        try:
+            for attempt, remaining in self._attempts():
+                self._count('calls')
+                try:
+                    response = chat.send_message(content, request_options={'timeout': remaining})
+                    text = response.text
+                except Exception as e:
+                    self._record_error(e)
+                    if not _is_retryable(e) or attempt >= self.max_retries or not self.breaker.allow():
+                        raise
+                    continue
+                self.breaker.record_success()
+                return text
+        finally:
+            self._release()
+
+    def stream(self, chat, content):
+        """
+        Send a message and return an iterator of response text chunks.
+
+        The concurrency slot and breaker check are taken here, on the calling
+        thread, so an overloaded client raises LLMUnavailable before any work
+        is queued. The slot is released when the iterator is exhausted or
+        closed. A failed attempt is only retried if nothing has been yielded yet.
+        """
+        self._acquire()
+        chunks = self._stream(chat, content)
+        # Run up to the try block, so that closing the iterator always releases the slot
+        next(chunks)
+        return chunks
+
+    def _stream(self, chat, content):
+        received = False
+        recorded = False
+        try:
+            yield
+            for attempt, remaining in self._attempts():
+                self._count('calls')
+                started = False
+                recorded = False
+                try:
+                    for chunk in chat.send_message(content, stream=True, request_options={'timeout': remaining}):
+                        started = received = True
+                        yield chunk.text
+                except Exception as e:
+                    self._record_error(e)
+                    recorded = True
+                    if started or not _is_retryable(e) or attempt >= self.max_retries or not self.breaker.allow():
+                        raise
+                    continue
+                self.breaker.record_success()
+                recorded = True
+                return
+        finally:
+            if not recorded:
+                # Closed early, e.g. the client disconnected: chunks arriving
+                # show the model is up; otherwise the call proved nothing
+                if received:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.abandon_trial()
+            self._release()
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self.counters)
+            metrics['in_flight'] = self.in_flight
+        metrics['max_concurrency'] = self.max_concurrency
+        metrics['breaker_state'] = self.breaker.state
+        metrics['breaker_trips'] = self.breaker.trips
+        metrics['consecutive_failures'] = self.breaker.failures
+        return metrics
+
+llm = LLMClient()
@@ -0,0 +1,149 @@
+"""
+In-process latency histograms served in the Prometheus text format.
+
+Every process keeps its own series; with several gunicorn workers each
+scrape of /metrics sees the worker that answered it.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds in seconds, from sub-millisecond model calls to slow LLM replies
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_registry = []
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+class Histogram:
+    """
+    Thread-safe latency histogram with a fixed set of label names
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # per-bucket counts (not cumulative), sum, count
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+        for key, counts, total, count in sorted(snapshot):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', f'{bound:g}')])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+def render():
+    """
+    All registered metrics in the Prometheus text exposition format
+    """
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by route',
+    ('method', 'route', 'status'))
+DB_QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds', 'Database statement execution time',
+    ('operation',))
+MODEL_INFERENCE_LATENCY = Histogram(
+    'model_inference_duration_seconds', 'Risk model scoring time',
+    ('model', 'function'))
+LLM_CALL_LATENCY = Histogram(
+    'llm_call_duration_seconds', 'Chat model call time, until the last streamed chunk for streams',
+    ('domain', 'mode', 'outcome'))
+
+def inference_span(model):
+    """
+    Decorator recording each call of a scoring function under MODEL_INFERENCE_LATENCY
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with MODEL_INFERENCE_LATENCY.time(model=model, function=fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def instrument_app(app):
+    """
+    Record every request's latency by method, route template and status.
+    For streamed responses this is the time until the response object is
+    returned, not until the stream ends.
+    """
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_latency(response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            REQUEST_LATENCY.observe(time.perf_counter() - started,
+                                    method=request.method, route=route, status=response.status_code)
+        return response
+
+def instrument_database():
+    """
+    Time every statement executed through any SQLAlchemy engine
+    """
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _start_query(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _end_query(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_metrics_started', None)
+        if started is not None:
+            operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+            DB_QUERY_LATENCY.observe(time.perf_counter() - started, operation=operation)
@@ -0,0 +1,139 @@
+import logging
+import os
+from datetime import datetime
+import numpy as np
+from sqlalchemy import Column, DateTime, MetaData, String, Table, insert, inspect, select, text, update
+from utils import SPLIT_MAX_LENGTHS, parse_int_parts
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNK_SIZE = int(os.getenv('BACKFILL_CHUNK_SIZE', 1000))
+
+# Data migrations that have finished, so upgrade() runs each one only once
+applied_migrations = Table(
+    'applied_migrations', MetaData(),
+    Column('name', String(64), primary_key=True),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+def create_missing_indexes(engine, metadata):
+    """
+    Create indexes declared on the models that don't exist yet.
+    db.create_all() only creates indexes together with new tables, so tables
+    created before an index was added to the model need this step.
+    """
+    inspector = inspect(engine)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                logger.info(f"Creating index {index.name} on {table.name}")
+                index.create(bind=engine)
+
+# Indexes superseded by a model index of a different name
+REPLACED_INDEXES = {
+    'health_data': ['ix_health_data_user_id_timestamp'],
+    'diabetes_data': ['ix_diabetes_data_user_id_timestamp'],
+}
+
+def drop_replaced_indexes(engine, replaced=REPLACED_INDEXES):
+    """
+    Drop indexes listed in replaced that still exist, once their replacement
+    has been created
+    """
+    inspector = inspect(engine)
+    for table_name, names in replaced.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table_name)}
+        for name in names:
+            if name in existing:
+                logger.info(f"Dropping replaced index {name} on {table_name}")
+                with engine.begin() as conn:
+                    conn.execute(text(f'DROP INDEX {name}'))
+
+def add_missing_columns(engine, metadata):
+    """
+    Add columns declared on the models that existing tables don't have yet.
+    New columns are added as nullable without defaults; backfills are separate.
+    """
+    inspector = inspect(engine)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            logger.info(f"Adding column {table.name}.{column.name} {column_type}")
+            with engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+def backfill_blood_pressure(db, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Fill health_data.systolic/diastolic from the blood_pressure string for rows
+    written before those columns existed. Malformed strings stay NULL; every
+    row written since has them set, so this only needs to run once.
+    """
+    from models import HealthData
+
+    last_id = 0
+    filled = 0
+    while True:
+        rows = db.session.execute(
+            select(HealthData.id, HealthData.blood_pressure)
+            .where(HealthData.id > last_id, HealthData.systolic.is_(None), HealthData.blood_pressure.isnot(None))
+            .order_by(HealthData.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+
+        ids = [row.id for row in rows]
+        parts, well_formed = parse_int_parts(np.array([row.blood_pressure for row in rows], dtype=object), 2,
+                                              SPLIT_MAX_LENGTHS['blood_pressure'])
+        updates = [
+            {'id': ids[i], 'systolic': int(parts[i, 0]), 'diastolic': int(parts[i, 1])}
+            for i in np.flatnonzero(well_formed)
+        ]
+        if updates:
+            db.session.execute(update(HealthData), updates)
+        db.session.commit()
+        filled += len(updates)
+        last_id = ids[-1]
+
+    if filled:
+        logger.info(f"Backfilled systolic/diastolic for {filled} health_data rows")
+
+# Run in order, once per database
+DATA_MIGRATIONS = [
+    ('backfill_blood_pressure', backfill_blood_pressure),
+]
+
+def run_data_migrations(db, migrations=DATA_MIGRATIONS):
+    """
+    Run the data migrations not yet recorded in applied_migrations, recording
+    each one as it finishes
+    """
+    applied_migrations.create(db.engine, checkfirst=True)
+    applied = set(db.session.execute(select(applied_migrations.c.name)).scalars())
+    for name, migrate in migrations:
+        if name in applied:
+            continue
+        migrate(db)
+        db.session.execute(insert(applied_migrations).values(name=name, applied_at=datetime.utcnow()))
+        db.session.commit()
+        logger.info(f"Applied data migration {name}")
+
+def upgrade(db):
+    """
+    Bring an existing database up to the current models. Safe to run repeatedly.
+    """
+    db.create_all()
+    add_missing_columns(db.engine, db.metadata)
+    create_missing_indexes(db.engine, db.metadata)
+    drop_replaced_indexes(db.engine)
+    run_data_migrations(db)
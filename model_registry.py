@@ -0,0 +1,94 @@
+import importlib
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MODEL_LOAD_TIMEOUT = float(os.getenv('MODEL_LOAD_TIMEOUT', 30))
+
+# Registry name -> module that loads the model at import
+MODEL_MODULES = {
+    'heart': 'risk_model',
+    'diabetes': 'diabetes_model',
+}
+
+class ModelUnavailable(Exception):
+    pass
+
+class ModelRegistry:
+    """
+    Loads the model modules in background threads and hands them out once ready.
+
+    start() should run in each worker process (not in a gunicorn --preload
+    master, since threads do not survive fork). If get() is called without
+    start(), the model is loaded synchronously in the calling thread.
+    """
+
+    def __init__(self, modules):
+        self._modules = dict(modules)
+        self._lock = threading.Lock()
+        self._state = {
+            name: {'state': 'pending', 'load_seconds': None, 'error': None, 'module': None, 'event': threading.Event()}
+            for name in self._modules
+        }
+
+    def start(self):
+        with self._lock:
+            pending = [name for name, entry in self._state.items() if entry['state'] == 'pending']
+            for name in pending:
+                self._state[name]['state'] = 'loading'
+        for name in pending:
+            threading.Thread(target=self._load, args=(name,), name=f"model-load-{name}", daemon=True).start()
+
+    def _load(self, name):
+        entry = self._state[name]
+        start = time.perf_counter()
+        try:
+            module = importlib.import_module(self._modules[name])
+            entry['module'] = module
+            entry['state'] = 'ready'
+            logger.info(f"Model {name} ready in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            entry['error'] = str(e)
+            entry['state'] = 'failed'
+            logger.error(f"Model {name} failed to load: {str(e)}")
+        finally:
+            entry['load_seconds'] = time.perf_counter() - start
+            entry['event'].set()
+
+    def get(self, name, timeout=MODEL_LOAD_TIMEOUT):
+        """
+        Return the loaded model module, waiting up to timeout seconds for warm-up
+        Raises ModelUnavailable if the model failed or is still loading
+        """
+        entry = self._state[name]
+        with self._lock:
+            load_here = entry['state'] == 'pending'
+            if load_here:
+                entry['state'] = 'loading'
+        if load_here:
+            self._load(name)
+        elif not entry['event'].wait(timeout):
+            raise ModelUnavailable(f"Model {name} is still loading")
+
+        if entry['state'] != 'ready':
+            raise ModelUnavailable(f"Model {name} failed to load: {entry['error']}")
+        return entry['module']
+
+    def status(self):
+        return {
+            name: {
+                'state': entry['state'],
+                'load_seconds': entry['load_seconds'],
+                'error': entry['error'],
+                'version': getattr(entry['module'], 'MODEL_VERSION', None)
+            }
+            for name, entry in self._state.items()
+        }
+
+    def ready(self):
+        return all(entry['state'] == 'ready' for entry in self._state.values())
+
+registry = ModelRegistry(MODEL_MODULES)
@@ -0,0 +1,234 @@
+"""
+Cross-validate candidate hyperparameters for the risk models and pick one
+per model under a single-row scoring latency budget.
+
+Candidates are cross-validated in parallel worker processes. Latency is then
+measured one candidate at a time in this process, through the same scoring
+path the service uses, so the timings don't compete for cores.
+
+    python model_selection.py [diabetes] [heart] [--folds N] [--workers N]
+                              [--latency-budget-ms MS] [--report PATH] [--write]
+
+--write stores the chosen hyperparameters in model_training.MODEL_PARAMS_FILE;
+the model modules pick them up (and retrain) on their next load.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import brier_score_loss, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+import model_training
+from forest_engine import FlatForest
+from linear_engine import LinearRiskScorer
+
+logger = logging.getLogger(__name__)
+
+MODEL_LATENCY_BUDGET_MS = float(os.getenv('MODEL_LATENCY_BUDGET_MS', 10))
+SELECTION_FOLDS = int(os.getenv('SELECTION_FOLDS', 3))
+LATENCY_SAMPLES = 300
+CALIBRATION_BINS = 10
+
+# name -> (estimator class, training data loader, candidate hyperparameters).
+# The first candidate of each list is the current default.
+CANDIDATES = {
+    'diabetes': (RandomForestClassifier, model_training.diabetes_training_data, [
+        {'random_state': 42},
+        {'n_estimators': 50, 'min_samples_leaf': 5, 'random_state': 42},
+        {'n_estimators': 50, 'max_depth': 12, 'random_state': 42},
+        {'n_estimators': 25, 'max_depth': 10, 'random_state': 42},
+    ]),
+    'heart': (LogisticRegression, model_training.heart_training_data, [
+        {'random_state': 42},
+        {'C': 0.1, 'random_state': 42},
+        {'C': 10.0, 'random_state': 42},
+    ]),
+}
+
+def calibration_error(y_true, proba, bins=CALIBRATION_BINS):
+    """
+    Expected calibration error: mean |observed rate - mean predicted probability|
+    over equal-width probability bins, weighted by bin size
+    """
+    bin_index = np.minimum((proba * bins).astype(int), bins - 1)
+    error = 0.0
+    for b in range(bins):
+        in_bin = bin_index == b
+        if in_bin.any():
+            error += in_bin.mean() * abs(y_true[in_bin].mean() - proba[in_bin].mean())
+    return float(error)
+
+def _fit(estimator_class, params, X, y):
+    scaler = StandardScaler()
+    model = estimator_class(**params)
+    model.fit(scaler.fit_transform(X), y)
+    return scaler, model
+
+def _quality(y_true, proba):
+    return {
+        'auc': float(roc_auc_score(y_true, proba)),
+        'brier': float(brier_score_loss(y_true, proba)),
+        'ece': calibration_error(y_true, proba)
+    }
+
+def evaluate(name, params, folds=SELECTION_FOLDS):
+    """
+    Cross-validate one candidate on the training split, then fit it on the
+    whole training split and score the held-out test split. Runs in a worker.
+
+    Returns:
+        tuple: (metrics dict, fitted scaler, fitted model)
+    """
+    estimator_class, load_data, _ = CANDIDATES[name]
+    X, y = load_data()
+    X_train, X_test, y_train, y_test = model_training.split(X, y)
+    X_train, X_test = X_train.to_numpy(np.float64), X_test.to_numpy(np.float64)
+    y_train, y_test = y_train.to_numpy(), y_test.to_numpy()
+
+    started = time.perf_counter()
+    fold_metrics = []
+    for train_idx, val_idx in StratifiedKFold(folds, shuffle=True, random_state=42).split(X_train, y_train):
+        scaler, model = _fit(estimator_class, params, X_train[train_idx], y_train[train_idx])
+        proba = model.predict_proba(scaler.transform(X_train[val_idx]))[:, 1]
+        fold_metrics.append(_quality(y_train[val_idx], proba))
+
+    scaler, model = _fit(estimator_class, params, X_train, y_train)
+    test = _quality(y_test, model.predict_proba(scaler.transform(X_test))[:, 1])
+
+    metrics = {
+        'model': name,
+        'params': params,
+        'cv_auc': float(np.mean([m['auc'] for m in fold_metrics])),
+        'cv_auc_std': float(np.std([m['auc'] for m in fold_metrics])),
+        'cv_brier': float(np.mean([m['brier'] for m in fold_metrics])),
+        'cv_ece': float(np.mean([m['ece'] for m in fold_metrics])),
+        'test_auc': test['auc'],
+        'test_ece': test['ece'],
+        'train_seconds': time.perf_counter() - started
+    }
+    return metrics, scaler, model
+
+def _scoring_function(name, scaler, model):
+    """
+    Single-row scoring as the service does it, including scaling
+    """
+    if name == 'heart':
+        # risk_model scores raw features with the scaler folded into the weights
+        return LinearRiskScorer(scaler, model).score
+
+    engine = os.getenv('DIABETES_INFERENCE_ENGINE', 'sklearn')
+    if engine in ('flat', 'auto'):
+        forest = FlatForest.from_sklearn(model)
+        return lambda row: forest.predict_proba((row - scaler.mean_) / scaler.scale_)
+    return lambda row: model.predict_proba((row - scaler.mean_) / scaler.scale_)
+
+def measure_latency(name, scaler, model, samples=LATENCY_SAMPLES):
+    """
+    p50/p99 milliseconds to score one row, over rows from the training data
+    """
+    X, _ = CANDIDATES[name][1]()
+    rows = X.to_numpy(np.float64)[:samples]
+    score = _scoring_function(name, scaler, model)
+    score(rows[:1])  # warm up
+
+    timings = []
+    for i in range(len(rows)):
+        row = rows[i] if name == 'heart' else rows[i:i + 1]
+        started = time.perf_counter()
+        score(row)
+        timings.append((time.perf_counter() - started) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+def select(results, budget_ms):
+    """
+    Highest cross-validated AUC among candidates within the p99 budget, or
+    the fastest candidate if none is
+    """
+    within = [r for r in results if r['p99_ms'] <= budget_ms]
+    if not within:
+        logger.warning(f"No {results[0]['model']} candidate meets the {budget_ms} ms p99 budget, using the fastest")
+        return min(results, key=lambda r: r['p99_ms'])
+    return max(within, key=lambda r: (r['cv_auc'], -r['p99_ms']))
+
+def run(names, folds=SELECTION_FOLDS, workers=None, budget_ms=MODEL_LATENCY_BUDGET_MS):
+    """
+    Evaluate every candidate of the named models
+
+    Returns:
+        dict: name -> {'candidates': [metrics...], 'selected': metrics}
+    """
+    jobs = [(name, params) for name in names for params in CANDIDATES[name][2]]
+    results = {name: [] for name in names}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(evaluate, name, params, folds) for name, params in jobs]
+        fitted = [future.result() for future in futures]
+
+    # Timed only after the pool has finished, so nothing else is using the CPU
+    for metrics, scaler, model in fitted:
+        metrics['p50_ms'], metrics['p99_ms'] = measure_latency(metrics['model'], scaler, model)
+        results[metrics['model']].append(metrics)
+
+    return {
+        name: {'candidates': candidates, 'selected': select(candidates, budget_ms)}
+        for name, candidates in results.items()
+    }
+
+def write_params(selection, path=None):
+    """
+    Merge the selected hyperparameters into the params file the loaders read
+    """
+    path = path or model_training.MODEL_PARAMS_FILE
+    params = model_training.load_selected_params(path)
+    for name, result in selection.items():
+        params[name] = result['selected']['params']
+    with open(path, 'w') as f:
+        json.dump(params, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return path
+
+def _print_report(selection, budget_ms):
+    header = f"{'params':<66} {'cv auc':>12} {'brier':>7} {'ece':>7} {'test auc':>8} {'p50 ms':>8} {'p99 ms':>8}"
+    for name, result in selection.items():
+        print(f"\n{name} (p99 budget {budget_ms:g} ms)")
+        print(header)
+        for r in result['candidates']:
+            mark = '*' if r is result['selected'] else ' '
+            print(f"{mark}{json.dumps(r['params'], sort_keys=True):<65} "
+                  f"{r['cv_auc']:.4f}±{r['cv_auc_std']:.3f} {r['cv_brier']:>7.4f} {r['cv_ece']:>7.4f} "
+                  f"{r['test_auc']:>8.4f} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-validate candidate models and pick one under a latency budget')
+    parser.add_argument('models', nargs='*', metavar='MODEL', help=f"Models to tune: {', '.join(sorted(CANDIDATES))} (default: all)")
+    parser.add_argument('--folds', type=int, default=SELECTION_FOLDS)
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per CPU)')
+    parser.add_argument('--latency-budget-ms', type=float, default=MODEL_LATENCY_BUDGET_MS,
+                        help='Maximum p99 single-row scoring latency')
+    parser.add_argument('--report', help='Write every candidate\'s metrics to this JSON file')
+    parser.add_argument('--write', action='store_true', help='Save the selected hyperparameters for the model loaders')
+    args = parser.parse_args()
+    unknown = set(args.models) - set(CANDIDATES)
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(sorted(unknown))}")
+
+    selection = run(args.models or sorted(CANDIDATES), args.folds, args.workers, args.latency_budget_ms)
+    _print_report(selection, args.latency_budget_ms)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(selection, f, indent=2)
+    if args.write:
+        path = write_params(selection)
+        print(f"\nSelected hyperparameters written to {path}; run python model_training.py to rebuild artifacts")
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
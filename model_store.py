@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACT_DIR = os.getenv('MODEL_ARTIFACT_DIR', os.path.join(BASE_DIR, 'artifacts'))
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 hex digest of a file's contents
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def compute_version(dataset_path, params):
+    """
+    Build an artifact version from the training data and hyperparameters
+
+    Args:
+        dataset_path (str): Path to the training CSV
+        params (dict): Hyperparameters used to fit the model (JSON serializable)
+
+    Returns:
+        str: Short hex digest identifying this data/parameter combination
+    """
+    digest = hashlib.sha256()
+    digest.update(file_hash(dataset_path).encode())
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+def artifact_path(name, version):
+    return os.path.join(ARTIFACT_DIR, f"{name}-{version}.joblib")
+
+def save_bundle(name, version, bundle):
+    """
+    Write a fitted bundle (scaler, model and metadata) to the artifact directory.
+    The file is written uncompressed so it can be memory-mapped on load, and
+    renamed into place so concurrent readers never see a partial file.
+    """
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    path = artifact_path(name, version)
+    fd, tmp_path = tempfile.mkstemp(dir=ARTIFACT_DIR, prefix=f".{name}-", suffix='.tmp')
+    os.close(fd)
+    try:
+        joblib.dump(bundle, tmp_path)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info(f"Saved {name} model artifact {path}")
+    return path
+
+def load_bundle(name, version):
+    """
+    Load a bundle for the given version, or None if no artifact exists.
+    NumPy arrays are memory-mapped read-only so forked workers share the pages.
+    """
+    path = artifact_path(name, version)
+    if not os.path.exists(path):
+        return None
+    try:
+        return joblib.load(path, mmap_mode='r')
+    except Exception as e:
+        logger.warning(f"Could not load {name} model artifact {path}: {str(e)}")
+        return None
+
+def load_or_train(name, dataset_path, params, train_fn):
+    """
+    Return the bundle for the current dataset and parameters, training and
+    saving it only when no matching artifact exists
+
+    Args:
+        name (str): Model name used in the artifact file name
+        dataset_path (str): Path to the training CSV
+        params (dict): Hyperparameters passed to train_fn
+        train_fn (callable): train_fn(dataset_path, params) -> bundle dict
+
+    Returns:
+        dict: Bundle with at least 'scaler', 'model' and 'version' keys
+    """
+    version = compute_version(dataset_path, params)
+    bundle = load_bundle(name, version)
+    if bundle is not None:
+        return bundle
+
+    logger.info(f"No {name} model artifact for version {version}, training")
+    bundle = train_fn(dataset_path, params)
+    bundle['version'] = version
+    try:
+        save_bundle(name, version, bundle)
+    except OSError as e:
+        logger.warning(f"Could not save {name} model artifact: {str(e)}")
+    return bundle
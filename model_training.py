@@ -0,0 +1,144 @@
+import argparse
+import json
+import logging
+import os
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from model_store import BASE_DIR, compute_version, save_bundle
+from forest_engine import FlatForest
+from dataset_cache import load_dataset
+
+logger = logging.getLogger(__name__)
+
+# Hyperparameters picked by model_selection.py. Entries here replace the
+# defaults below, which changes the artifact version and so retrains on load.
+MODEL_PARAMS_FILE = os.getenv('MODEL_PARAMS_FILE', os.path.join(BASE_DIR, 'model_params.json'))
+
+def load_selected_params(path=MODEL_PARAMS_FILE):
+    """
+    Returns the model name -> hyperparameters mapping from the params file,
+    or {} if there is none
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable {path}: {str(e)}")
+        return {}
+
+SELECTED_PARAMS = load_selected_params()
+
+DIABETES_DATASET = 'diabetes_prediction_dataset.csv'
+DIABETES_PARAMS = SELECTED_PARAMS.get('diabetes', {'random_state': 42})
+
+HEART_DATASET = 'heart.csv'
+HEART_PARAMS = SELECTED_PARAMS.get('heart', {'random_state': 42})
+
+def diabetes_training_data(dataset_path=DIABETES_DATASET):
+    """
+    Returns (X, y) for the diabetes model, with smoking_history one-hot encoded
+    """
+    diabetes_data = load_dataset(dataset_path)
+    X = diabetes_data[['age', 'bmi', 'HbA1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease', 'smoking_history']]
+
+    # Convert smoking_history to numeric using one-hot encoding
+    X = pd.get_dummies(X, columns=['smoking_history'], prefix='smoking')
+
+    y = diabetes_data['diabetes']
+    return X, y
+
+def heart_training_data(dataset_path=HEART_DATASET):
+    """
+    Returns (X, y) for the heart disease model
+    """
+    df = load_dataset(dataset_path)
+    X = df[['age', 'trestbps', 'chol', 'thalach', 'oldpeak']]
+    y = df['target']
+    return X, y
+
+def split(X, y):
+    """
+    The fixed train/test split every model is trained and evaluated on
+    """
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+def train_diabetes_model(dataset_path=DIABETES_DATASET, params=DIABETES_PARAMS):
+    """
+    Fit the diabetes scaler and RandomForest model from the training CSV
+
+    Returns:
+        dict: Bundle with 'scaler', 'model' and 'feature_columns'
+    """
+    X, y = diabetes_training_data(dataset_path)
+    X_train, X_test, y_train, y_test = split(X, y)
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+
+    model = RandomForestClassifier(**params)
+    model.fit(X_train_scaled, y_train)
+
+    return {
+        'scaler': scaler,
+        'model': model,
+        'feature_columns': list(X.columns),
+        # Exported for the vectorized engine; stored as plain arrays so they are memory-mapped on load
+        'flat_forest': FlatForest.from_sklearn(model).to_arrays()
+    }
+
+def train_heart_model(dataset_path=HEART_DATASET, params=HEART_PARAMS):
+    """
+    Fit the heart disease scaler and LogisticRegression model from the training CSV
+
+    Returns:
+        dict: Bundle with 'scaler' and 'model'
+    """
+    X, y = heart_training_data(dataset_path)
+
+    # Split and scale data
+    X_train, X_test, y_train, y_test = split(X, y)
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+
+    # Train model
+    model = LogisticRegression(**params)
+    model.fit(X_train_scaled, y_train)
+
+    return {'scaler': scaler, 'model': model}
+
+# name -> (dataset path, hyperparameters, training function)
+MODELS = {
+    'diabetes': (DIABETES_DATASET, DIABETES_PARAMS, train_diabetes_model),
+    'heart': (HEART_DATASET, HEART_PARAMS, train_heart_model),
+}
+
+def train_and_save(name):
+    """
+    Train the named model and write its versioned artifact
+    Returns the artifact path
+    """
+    dataset_path, params, train_fn = MODELS[name]
+    version = compute_version(dataset_path, params)
+    bundle = train_fn(dataset_path, params)
+    bundle['version'] = version
+    return save_bundle(name, version, bundle)
+
+def main():
+    parser = argparse.ArgumentParser(description='Train risk models and write versioned artifacts')
+    parser.add_argument('models', nargs='*', metavar='MODEL', help=f"Models to train: {', '.join(sorted(MODELS))} (default: all)")
+    args = parser.parse_args()
+    unknown = set(args.models) - set(MODELS)
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(sorted(unknown))}")
+
+    for name in args.models or sorted(MODELS):
+        path = train_and_save(name)
+        print(f"{name}: {path}")
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -8,21 +8,40 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(256), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    health_data = db.relationship('HealthData', backref='user', lazy=True)
-    diabetes_data = db.relationship('DiabetesData', backref='user', lazy=True)
+    # Readings are only ever read through explicit, paginated queries: these
+    # return a query instead of loading every row, and reading.user raises
+    # rather than issuing a query per row
+    health_data = db.relationship('HealthData', backref=db.backref('user', lazy='raise'), lazy='dynamic')
+    diabetes_data = db.relationship('DiabetesData', backref=db.backref('user', lazy='raise'), lazy='dynamic')
 
 class HealthData(db.Model):
+    __table_args__ = (
+        # History queries filter by user and page by (timestamp, id) desc
+        db.Index('ix_health_data_user_id_timestamp_id', 'user_id', 'timestamp', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    age = db.Column(db.Float)
     blood_pressure = db.Column(db.String(10))
+    # Parsed from blood_pressure at write time so it can be queried numerically
+    systolic = db.Column(db.Integer)
+    diastolic = db.Column(db.Integer)
     heart_rate = db.Column(db.Integer)
     temperature = db.Column(db.Float)
     weight = db.Column(db.Float)
     risk_score = db.Column(db.Float)
+    model_version = db.Column(db.String(32))  # artifact version that produced risk_score
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     cholesterol = db.Column(db.Float)
+    # Model input stored so readings can be re-scored; NULL on rows written before it was kept
+    st_depression = db.Column(db.Float)
 
 class DiabetesData(db.Model):
+    __table_args__ = (
+        db.Index('ix_diabetes_data_user_id_timestamp_id', 'user_id', 'timestamp', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     gender = db.Column(db.String(10))
@@ -34,4 +53,5 @@ class DiabetesData(db.Model):
     hba1c_level = db.Column(db.Float)
     blood_glucose_level = db.Column(db.Float)
     risk_score = db.Column(db.Float)
+    model_version = db.Column(db.String(32))  # artifact version that produced risk_score
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Re-score stored readings whose risk_score came from an older model version.
+
+Rows are streamed in id order in chunks, scored with one vectorized call per
+chunk, and written back with a bulk UPDATE by primary key. Progress is
+checkpointed after every chunk, so an interrupted run resumes where it
+stopped. With --workers N the id range is split into N partitions that run
+in separate processes.
+
+    python rescore.py health|diabetes [--chunk-size N] [--workers N]
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+logger = logging.getLogger(__name__)
+
+RESCORE_CHUNK_SIZE = int(os.getenv('RESCORE_CHUNK_SIZE', 1000))
+RESCORE_CHECKPOINT_DIR = os.getenv('RESCORE_CHECKPOINT_DIR', 'rescore_checkpoints')
+
+def _write_json(path, data):
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def _feature_columns(kind):
+    if kind == 'health':
+        return ('age', 'systolic', 'cholesterol', 'heart_rate', 'st_depression')
+    return ('age', 'bmi', 'hba1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease', 'smoking_history')
+
+def _target(kind):
+    """
+    Returns (model class, model module, function mapping a row to a record,
+    function encoding a list of records for score_batch)
+    """
+    from model_registry import registry
+    from models import HealthData, DiabetesData
+
+    if kind == 'health':
+        def record(row):
+            return {
+                'age': row.age,
+                'systolic': row.systolic,
+                'cholesterol': row.cholesterol,
+                'heart_rate': row.heart_rate,
+                # NULL on rows stored before st_depression was kept: those are
+                # skipped rather than re-scored with a guessed value
+                'st_depression': row.st_depression
+            }
+        module = registry.get('heart')
+        return HealthData, module, record, lambda records: module.encode_batch(
+            records, module.STORED_FEATURE_FIELDS, module.STORED_FEATURE_DEFAULTS)
+    if kind == 'diabetes':
+        def record(row):
+            return {
+                'age': row.age,
+                'bmi': row.bmi,
+                'hba1c_level': row.hba1c_level,
+                'blood_glucose_level': row.blood_glucose_level,
+                'hypertension': int(bool(row.hypertension)),
+                'heart_disease': int(bool(row.heart_disease)),
+                'smoking_history': row.smoking_history
+            }
+        module = registry.get('diabetes')
+        return DiabetesData, module, record, module.encode_batch
+    raise ValueError(f"Unknown kind: {kind}")
+
+def _stale(model, version):
+    return (model.model_version.is_(None)) | (model.model_version != version)
+
+def rescore_range(kind, start_id, end_id, checkpoint_path, chunk_size=RESCORE_CHUNK_SIZE):
+    """
+    Re-score stale rows with start_id <= id <= end_id, resuming from the
+    last id recorded in checkpoint_path
+
+    Returns:
+        dict: counts of updated and skipped (unscoreable) rows
+    """
+    from sqlalchemy import select, update
+    from app import app, db
+
+    with app.app_context():
+        model, model_module, to_record, encode = _target(kind)
+        version = model_module.MODEL_VERSION
+        checkpoint = _read_json(checkpoint_path) or {'last_id': start_id - 1, 'updated': 0, 'skipped': 0}
+
+        columns = [model.id] + [getattr(model, c) for c in _feature_columns(kind)]
+        while True:
+            rows = db.session.execute(
+                select(*columns)
+                .where(model.id > checkpoint['last_id'], model.id <= end_id, _stale(model, version))
+                .order_by(model.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            features, valid, errors = encode([to_record(row) for row in rows])
+            scores = model_module.score_batch(features)
+            updates = [
+                {'id': rows[index].id, 'risk_score': score, 'model_version': version}
+                for index, score in zip(valid, scores)
+            ]
+            if updates:
+                db.session.execute(update(model), updates)
+            db.session.commit()
+
+            checkpoint['last_id'] = rows[-1].id
+            checkpoint['updated'] += len(updates)
+            checkpoint['skipped'] += len(errors)
+            _write_json(checkpoint_path, checkpoint)
+            logger.info(f"{kind} ids <= {checkpoint['last_id']}: {checkpoint['updated']} updated, {checkpoint['skipped']} skipped")
+
+        return {'updated': checkpoint['updated'], 'skipped': checkpoint['skipped']}
+
+def plan(kind, workers, checkpoint_dir=RESCORE_CHECKPOINT_DIR):
+    """
+    Split the stale id range into partitions, reusing a saved plan for the
+    same model version so resumed runs keep their partition checkpoints
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    from sqlalchemy import select, func
+    from app import app, db
+
+    with app.app_context():
+        model, model_module, _, _ = _target(kind)
+        version = model_module.MODEL_VERSION
+        manifest_path = os.path.join(checkpoint_dir, f"{kind}-{version}.json")
+        manifest = _read_json(manifest_path)
+        if manifest is not None:
+            return version, manifest['partitions']
+
+        low, high = db.session.execute(
+            select(func.min(model.id), func.max(model.id)).where(_stale(model, version))
+        ).one()
+        partitions = []
+        if low is not None:
+            step = (high - low) // workers + 1
+            partitions = [[start, min(start + step - 1, high)] for start in range(low, high + 1, step)]
+
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        _write_json(manifest_path, {'kind': kind, 'version': version, 'partitions': partitions})
+        return version, partitions
+
+def run(kind, workers=1, chunk_size=RESCORE_CHUNK_SIZE, checkpoint_dir=RESCORE_CHECKPOINT_DIR):
+    version, partitions = plan(kind, workers, checkpoint_dir)
+    jobs = [
+        (kind, start, end, os.path.join(checkpoint_dir, f"{kind}-{version}-{start}-{end}.json"), chunk_size)
+        for start, end in partitions
+    ]
+    if workers <= 1 or len(jobs) <= 1:
+        results = [rescore_range(*job) for job in jobs]
+    else:
+        # Spawned workers get their own database connections and model copies
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = list(pool.map(rescore_range, *zip(*jobs)))
+
+    return {
+        'version': version,
+        'updated': sum(r['updated'] for r in results),
+        'skipped': sum(r['skipped'] for r in results)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-score stored readings with the current model version')
+    parser.add_argument('kind', choices=['health', 'diabetes'])
+    parser.add_argument('--chunk-size', type=int, default=RESCORE_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--checkpoint-dir', default=RESCORE_CHECKPOINT_DIR)
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+
+    # Workers import the app; they don't need background model warm-up
+    os.environ.setdefault('MODEL_WARMUP', '0')
+    result = run(args.kind, args.workers, args.chunk_size, args.checkpoint_dir)
+    print(f"{args.kind}: {result['updated']} rows re-scored with model {result['version']}, "
+          f"{result['skipped']} could not be scored")
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
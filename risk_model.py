@@ -1,24 +1,40 @@
 import numpy as np
-import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-
-# Load and prepare the model once
-df = pd.read_csv('heart.csv')
-X = df[['age', 'trestbps', 'chol', 'thalach', 'oldpeak']]
-y = df['target']
-
-# Split and scale data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
-
-# Train model
-model = LogisticRegression(random_state=42)
-model.fit(X_train_scaled, y_train)
+from model_store import load_or_train
+from model_training import HEART_DATASET, HEART_PARAMS, train_heart_model
+from cache import prediction_caches
+from linear_engine import LinearRiskScorer
+from metrics import inference_span
+from utils import HEALTH_SCHEMA, validate_record, validate_columns
 
+# Load the persisted model once, training it only if no artifact exists yet
+_bundle = load_or_train('heart', HEART_DATASET, HEART_PARAMS, train_heart_model)
+scaler = _bundle['scaler']
+model = _bundle['model']
+MODEL_VERSION = _bundle['version']
+
+scorer = LinearRiskScorer(scaler, model)
+_cache = prediction_caches['heart']
+
+# Request keys validated against utils.HEALTH_SCHEMA; blood_pressure yields
+# systolic and diastolic, of which the model uses systolic
+FEATURE_FIELDS = ['age', 'blood_pressure', 'cholesterol', 'heart_rate', 'st_depression']
+FEATURE_DEFAULTS = {'st_depression': 0}
+FEATURE_COLUMNS = ['age', 'systolic', 'cholesterol', 'heart_rate', 'st_depression']
+# The same features read from stored HealthData columns, where systolic is already parsed.
+# st_depression has no default there: rows stored before it was kept can't be re-scored.
+STORED_FEATURE_FIELDS = FEATURE_COLUMNS
+STORED_FEATURE_DEFAULTS = {}
+
+def _extract_features(data):
+    """
+    Validate a health data dict and return the model's feature list
+    [age, systolic, cholesterol, heart_rate, st_depression]
+    Raises ValueError on missing or out-of-range values
+    """
+    values = validate_record(data, FEATURE_FIELDS, HEALTH_SCHEMA, FEATURE_DEFAULTS)
+    return [float(values[column]) for column in FEATURE_COLUMNS]
+
+@inference_span('heart')
 def predict_heart_disease_risk(data):
     """
     Predict heart disease risk using trained model
@@ -30,53 +46,71 @@ def predict_heart_disease_risk(data):
 
     Returns:
         float: Risk score between 0 and 1
+
+    Raises:
+        ValueError: If a feature is missing or out of range
     """
-    try:
-        # Extract and validate features
-        features = []
-
-        # Age
-        age = float(data.get('age', 0))
-        if not (20 <= age <= 100):
-            raise ValueError("Age must be between 20 and 100")
-        features.append(age)
-
-        # Blood pressure (systolic)
-        bp = data.get('blood_pressure', '')
-        try:
-            systolic = float(bp.split('/')[0])
-            if not (80 <= systolic <= 200):
-                raise ValueError
-        except (ValueError, IndexError):
-            raise ValueError("Invalid blood pressure format. Expected format: '120/80'")
-        features.append(systolic)
-
-        # Cholesterol
-        chol = float(data.get('cholesterol', 0))
-        if not (100 <= chol <= 600):
-            raise ValueError("Cholesterol must be between 100 and 600")
-        features.append(chol)
-
-        # Heart rate
-        hr = float(data.get('heart_rate', 0))
-        if not (40 <= hr <= 200):
-            raise ValueError("Heart rate must be between 40 and 200")
-        features.append(hr)
-
-        # ST depression (oldpeak)
-        oldpeak = float(data.get('st_depression', 0))
-        if not (0 <= oldpeak <= 6):
-            raise ValueError("ST depression must be between 0 and 6")
-        features.append(oldpeak)
-
-        # Scale features
-        features_scaled = scaler.transform(np.array(features).reshape(1, -1))
+    features = _extract_features(data)
 
+    # Identical features under the same model version give the same score
+    cache_key = (MODEL_VERSION, *features)
+    risk_score = _cache.get(cache_key)
+    if risk_score is None:
         # Get probability of heart disease
-        risk_score = model.predict_proba(features_scaled)[0][1]
+        risk_score = scorer.score(features)
+        _cache.set(cache_key, risk_score)
 
-        return float(risk_score)
+    return risk_score
 
-    except Exception as e:
-        print(f"Prediction error: {str(e)}")
-        return 0.0
\ No newline at end of file
+def encode_batch(records, fields=FEATURE_FIELDS, defaults=FEATURE_DEFAULTS):
+    """
+    Validate records into an (N, 5) feature matrix, skipping invalid ones.
+    Pass STORED_FEATURE_FIELDS and STORED_FEATURE_DEFAULTS for records built
+    from stored rows.
+
+    Returns:
+        tuple: (features, valid, errors) where features has one row per valid
+        record, valid lists their indexes in records, and errors is a list of
+        (index, message) for the rest
+    """
+    values, valid, errors = validate_columns(records, fields, HEALTH_SCHEMA, defaults)
+    features = values.loc[valid, FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    return features, np.flatnonzero(valid).tolist(), errors
+
+@inference_span('heart')
+def score_batch(features):
+    """
+    Score a feature matrix from encode_batch
+    Returns a list of risk scores between 0 and 1
+    """
+    if len(features) == 0:
+        return []
+    return scorer.score(features).tolist()
+
+@inference_span('heart')
+def predict_heart_disease_risk_batch(records):
+    """
+    Predict heart disease risk for many records with a single model call
+
+    Args:
+        records (list): List of dicts with the same keys as predict_heart_disease_risk
+
+    Returns:
+        list: Risk scores between 0 and 1, in the same order as records
+
+    Raises:
+        ValueError: If any record is missing a value or out of range
+    """
+    features, valid, errors = encode_batch(records)
+    if errors:
+        index, message = errors[0]
+        raise ValueError(f"Invalid record at index {index}: {message}")
+    return score_batch(features)
+
+def _sklearn_risk(features):
+    """
+    Reference scoring through scaler.transform and model.predict_proba.
+    Kept for parity checks and benchmarks.
+    """
+    features = np.asarray(features, dtype=np.float64).reshape(-1, 5)
+    return model.predict_proba(scaler.transform(features))[:, 1]
\ No newline at end of file
@@ -1,16 +1,19 @@
 
+// Daily min/avg/max buckets computed on the server; the chart plots the averages
+const HEALTH_HISTORY_URL = '/api/health-history?resolution=day&range=90d';
+
 document.addEventListener('DOMContentLoaded', async function() {
     const ctx = document.getElementById('healthChart').getContext('2d');
     let healthChart;
 
     // Fetch health data
     try {
-        const response = await fetch('/api/health-history');
+        const response = await fetch(HEALTH_HISTORY_URL);
         const healthData = await response.json();
         
-        const labels = healthData.map(d => d.timestamp);
-        const systolicData = healthData.map(d => d.blood_pressure ? parseInt(d.blood_pressure.split('/')[0]) : null);
-        const heartRateData = healthData.map(d => d.heart_rate);
+        const labels = healthData.map(d => d.bucket);
+        const systolicData = healthData.map(d => d.systolic.avg);
+        const heartRateData = healthData.map(d => d.heart_rate.avg);
         
         healthChart = new Chart(ctx, {
             type: 'line',
@@ -89,12 +92,12 @@ document.addEventListener('DOMContentLoaded', async function() {
             riskAdviceElement.textContent = advice;
             
             // Refresh chart data
-            const historyResponse = await fetch('/api/health-history');
+            const historyResponse = await fetch(HEALTH_HISTORY_URL);
             const newHealthData = await historyResponse.json();
             
-            healthChart.data.labels = newHealthData.map(d => d.timestamp);
-            healthChart.data.datasets[0].data = newHealthData.map(d => d.blood_pressure ? parseInt(d.blood_pressure.split('/')[0]) : null);
-            healthChart.data.datasets[1].data = newHealthData.map(d => d.heart_rate);
+            healthChart.data.labels = newHealthData.map(d => d.bucket);
+            healthChart.data.datasets[0].data = newHealthData.map(d => d.systolic.avg);
+            healthChart.data.datasets[1].data = newHealthData.map(d => d.heart_rate.avg);
             healthChart.update();
             
             // Show success message
@@ -13,25 +13,57 @@ document.addEventListener('DOMContentLoaded', function() {
         appendMessage('user', message);
         chatInput.value = '';
 
+        // Stream the reply into a single bot message as chunks arrive
+        const botText = appendMessage('bot', '');
         try {
-            const response = await fetch('/api/chat', {
+            const response = await fetch('/api/chat/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({ message })
             });
-            
-            const data = await response.json();
-            
-            // Add bot response
-            appendMessage('bot', data.response);
+            if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+
+            await readEvents(response, (event, data) => {
+                if (event === 'message') {
+                    botText.textContent += data.text;
+                } else if (event === 'error') {
+                    throw new Error(data.message);
+                }
+                chatMessages.scrollTop = chatMessages.scrollHeight;
+            });
         } catch (error) {
             console.error('Error:', error);
-            appendMessage('bot', 'Sorry, I encountered an error. Please try again.');
+            botText.textContent = 'Sorry, I encountered an error. Please try again.';
         }
     });
 
+    // Parse a Server-Sent Events response body, calling onEvent(event, data) per event
+    async function readEvents(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                let event = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                if (event === 'done') return;
+                onEvent(event, data ? JSON.parse(data) : {});
+            }
+        }
+    }
+
     function appendMessage(sender, text) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `chat-message ${sender}-message`;
@@ -43,5 +75,6 @@ document.addEventListener('DOMContentLoaded', function() {
         `;
         chatMessages.appendChild(messageDiv);
         chatMessages.scrollTop = chatMessages.scrollHeight;
+        return messageDiv.querySelector('p');
     }
 });
@@ -1,15 +1,18 @@
+// Daily min/avg/max buckets computed on the server; the chart plots the averages
+const DIABETES_HISTORY_URL = '/api/diabetes-history?resolution=day&range=90d';
+
 document.addEventListener('DOMContentLoaded', async function() {
     const ctx = document.getElementById('diabetesChart').getContext('2d');
     let diabetesChart;
 
     // Fetch diabetes data
     try {
-        const response = await fetch('/api/diabetes-history');
+        const response = await fetch(DIABETES_HISTORY_URL);
         const diabetesData = await response.json();
         
-        const labels = diabetesData.map(d => d.timestamp);
-        const glucoseData = diabetesData.map(d => d.blood_glucose_level);
-        const hba1cData = diabetesData.map(d => d.hba1c_level);
+        const labels = diabetesData.map(d => d.bucket);
+        const glucoseData = diabetesData.map(d => d.blood_glucose_level.avg);
+        const hba1cData = diabetesData.map(d => d.hba1c_level.avg);
         
         diabetesChart = new Chart(ctx, {
             type: 'line',
@@ -88,12 +91,12 @@ document.addEventListener('DOMContentLoaded', async function() {
             riskAdviceElement.textContent = advice;
             
             // Refresh chart data
-            const historyResponse = await fetch('/api/diabetes-history');
+            const historyResponse = await fetch(DIABETES_HISTORY_URL);
             const newDiabetesData = await historyResponse.json();
             
-            diabetesChart.data.labels = newDiabetesData.map(d => d.timestamp);
-            diabetesChart.data.datasets[0].data = newDiabetesData.map(d => d.blood_glucose_level);
-            diabetesChart.data.datasets[1].data = newDiabetesData.map(d => d.hba1c_level);
+            diabetesChart.data.labels = newDiabetesData.map(d => d.bucket);
+            diabetesChart.data.datasets[0].data = newDiabetesData.map(d => d.blood_glucose_level.avg);
+            diabetesChart.data.datasets[1].data = newDiabetesData.map(d => d.hba1c_level.avg);
             diabetesChart.update();
             
             // Show success message
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+# Score through the models, not the prediction caches
+os.environ.setdefault('PREDICTION_CACHE_SIZE', '0')
+
+# The app reads these at import: a throwaway database (or TEST_DATABASE_URL),
+# the offline LLM and no background model warm-up
+os.environ['DATABASE_URL'] = os.getenv('TEST_DATABASE_URL') or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ['LLM_BACKEND'] = 'fake'
+os.environ.setdefault('SESSION_SECRET', 'test')
+os.environ.setdefault('MODEL_WARMUP', '0')
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app
+    app.config['TESTING'] = True
+    return app
+
+@pytest.fixture
+def client(app):
+    """
+    A test client signed in as a new user
+    """
+    client = app.test_client()
+    email = f"test-{uuid.uuid4().hex[:8]}@example.com"
+    client.post('/register', data={'email': email, 'password': 'test-password', 'name': 'Test'})
+    response = client.post('/login', data={'email': email, 'password': 'test-password'})
+    assert response.status_code == 302 and 'login' not in response.headers['Location']
+    return client
@@ -0,0 +1,55 @@
+"""
+The SSE chat endpoints: chunks then 'done', or an 'error' event when the
+reply can't be produced
+"""
+import json
+
+import pytest
+
+import llm_client
+
+def _events(response):
+    """
+    (event name, data) pairs of an SSE body; unnamed events are 'data'
+    """
+    events = []
+    for block in response.get_data(as_text=True).strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((fields.get('event', 'data'), json.loads(fields['data'])))
+    return events
+
+@pytest.mark.parametrize('path', ['/api/chat/stream', '/api/diabetes-chat/stream'])
+def test_stream_ends_with_done(client, path):
+    events = _events(client.post(path, json={'message': 'How is my blood pressure?'}))
+
+    assert events[-1] == ('done', {})
+    assert ''.join(data['text'] for name, data in events[:-1]) == "Fake response to: How is my blood pressure?"
+
+@pytest.mark.parametrize('body', [{}, {'message': None}, {'message': '  '}, {'message': 42}])
+def test_stream_without_message_is_rejected(client, body):
+    response = client.post('/api/chat/stream', json=body)
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == "Message is required"
+
+def test_setup_error_is_an_error_event(client, monkeypatch):
+    def fail(domain, user_id):
+        raise RuntimeError("history unavailable")
+    # By name: ai_helper can only be imported once the app fixture has loaded app
+    monkeypatch.setattr('ai_helper.build_conversation', fail)
+
+    response = client.post('/api/chat/stream', json={'message': 'How is my blood pressure?'})
+
+    assert response.status_code == 200
+    assert _events(response) == [('error', {'message': "history unavailable"})]
+
+def test_model_error_is_an_error_event(client, monkeypatch):
+    def blocked(self, content, stream=False, **kwargs):
+        raise ValueError("Response was blocked")
+    monkeypatch.setattr(llm_client.FakeChat, 'send_message', blocked)
+
+    response = client.post('/api/chat/stream', json={'message': 'How is my blood pressure?'})
+
+    assert _events(response) == [('error', {'message': "Response was blocked"})]
+    assert llm_client.llm.breaker.state == 'closed'
+    assert llm_client.llm.in_flight == 0
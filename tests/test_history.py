@@ -0,0 +1,66 @@
+"""
+Keyset pagination of the history endpoints by a (timestamp, id) cursor
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+@pytest.fixture
+def readings(app, client):
+    """
+    Seven readings for the signed-in user, five of them sharing a timestamp.
+    Returns their heart rates, which tell them apart, newest first.
+    """
+    from app import db
+    from models import HealthData
+
+    with client.session_transaction() as session:
+        user_id = int(session['_user_id'])
+    shared = datetime(2024, 1, 2)
+    timestamps = [datetime(2024, 1, 1)] + [shared] * 5 + [datetime(2024, 1, 3)]
+    with app.app_context():
+        rows = [HealthData(user_id=user_id, blood_pressure='120/80', systolic=120, diastolic=80,
+                           heart_rate=60 + i, timestamp=timestamp)
+                for i, timestamp in enumerate(timestamps)]
+        db.session.add_all(rows)
+        db.session.commit()
+        rows.sort(key=lambda row: (row.timestamp, row.id), reverse=True)
+        return [row.heart_rate for row in rows]
+
+def _pages(client, limit, before=None):
+    pages = []
+    while True:
+        query = {'limit': limit}
+        if before:
+            query['before'] = before
+        response = client.get('/api/health-history', query_string=query)
+        assert response.status_code == 200
+        # Each page is oldest first
+        pages.append([row['heart_rate'] for row in reversed(response.get_json())])
+        before = response.headers.get('X-Next-Before')
+        if before is None:
+            return pages
+
+def test_pages_cover_rows_sharing_a_timestamp(client, readings):
+    pages = _pages(client, limit=2)
+
+    assert [heart_rate for page in pages for heart_rate in page] == readings
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+
+def test_cursor_is_timestamp_and_id(client, readings):
+    response = client.get('/api/health-history', query_string={'limit': 2})
+    timestamp, row_id = response.headers['X-Next-Before'].split(',')
+
+    assert datetime.fromisoformat(timestamp) == datetime(2024, 1, 2)
+    assert int(row_id) > 0
+
+def test_bare_timestamp_cursor_pages_by_timestamp(client, readings):
+    before = (datetime(2024, 1, 2) + timedelta(seconds=1)).isoformat()
+    response = client.get('/api/health-history', query_string={'before': before, 'limit': 10})
+
+    assert [row['heart_rate'] for row in reversed(response.get_json())] == readings[1:]
+
+def test_invalid_limit(client):
+    response = client.get('/api/health-history', query_string={'limit': 0})
+
+    assert response.status_code == 400
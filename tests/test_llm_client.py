@@ -0,0 +1,141 @@
+"""
+Circuit breaker state transitions and how LLMClient feeds it
+"""
+import pytest
+
+import llm_client
+from llm_client import CircuitBreaker, LLMClient, LLMUnavailable
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_client.time, 'monotonic', clock)
+    return clock
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+class ScriptedChat:
+    """
+    Raises error on every send_message if given, otherwise replies 'ok'
+    (streamed as two chunks)
+    """
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    def send_message(self, content, stream=False, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return [Chunk('o'), Chunk('k')] if stream else Chunk('ok')
+
+def _client(threshold=2, max_retries=0):
+    return LLMClient(max_concurrency=2, max_retries=max_retries, backoff_base=0,
+                     breaker=CircuitBreaker(threshold=threshold, cooldown=30))
+
+def test_breaker_opens_after_threshold_then_half_opens(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+
+    breaker.record_failure()
+    assert breaker.state == 'closed' and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow() and breaker.state == 'half_open'
+    # Only the one trial call is let through
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.failures == 0 and breaker.trips == 1
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == 'open' and breaker.trips == 2
+    assert not breaker.allow()
+
+def test_abandoned_trial_lets_the_next_call_try(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.abandon_trial()
+
+    assert breaker.state == 'open'
+    assert breaker.allow() and breaker.state == 'half_open'
+
+def test_availability_errors_open_the_breaker(clock):
+    client = _client()
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            client.send(ScriptedChat(ConnectionError()), 'hi')
+
+    assert client.breaker.state == 'open'
+    with pytest.raises(LLMUnavailable):
+        client.send(ScriptedChat(), 'hi')
+    assert client.counters['rejected_open'] == 1
+
+def test_client_errors_do_not_open_the_breaker(clock):
+    client = _client()
+
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            client.send(ScriptedChat(ValueError("Response was blocked")), 'hi')
+        with pytest.raises(ValueError):
+            list(client.stream(ScriptedChat(ValueError("Invalid argument")), 'hi'))
+
+    assert client.breaker.state == 'closed'
+    assert client.counters['failures'] == 10
+    assert client.send(ScriptedChat(), 'hi') == 'ok'
+
+def test_only_availability_errors_are_retried(clock):
+    client = _client(threshold=10, max_retries=2)
+    blocked, flaky = ScriptedChat(ValueError()), ScriptedChat(TimeoutError())
+
+    with pytest.raises(ValueError):
+        client.send(blocked, 'hi')
+    with pytest.raises(TimeoutError):
+        client.send(flaky, 'hi')
+
+    assert (blocked.calls, flaky.calls) == (1, 3)
+
+def test_stream_closed_early_releases_its_slot(clock):
+    client = _client()
+
+    stream = client.stream(ScriptedChat(), 'hi')
+    assert client.in_flight == 1
+    assert next(stream) == 'o'
+    stream.close()
+
+    assert client.in_flight == 0
+    assert client.breaker.state == 'closed'
+
+def test_unstarted_trial_stream_is_abandoned(clock):
+    client = _client(threshold=1)
+    with pytest.raises(ConnectionError):
+        client.send(ScriptedChat(ConnectionError()), 'hi')
+    clock.now += 30
+
+    client.stream(ScriptedChat(), 'hi').close()
+
+    assert client.in_flight == 0
+    assert client.breaker.state == 'open'
+    assert client.breaker.allow()
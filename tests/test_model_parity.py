@@ -0,0 +1,105 @@
+"""
+The optimized scoring paths must agree with sklearn's predict_proba:
+FlatForest, LinearRiskScorer, and the single-row and batch paths of the
+diabetes and heart model modules.
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from forest_engine import FlatForest
+from linear_engine import LinearRiskScorer
+
+ATOL = 1e-12
+
+DIABETES_RECORDS = [
+    {'age': 54, 'bmi': 27.3, 'hba1c_level': 6.6, 'blood_glucose_level': 140,
+     'hypertension': 0, 'heart_disease': 0, 'smoking_history': 'never'},
+    {'age': 80, 'bmi': 25.2, 'hba1c_level': 6.6, 'blood_glucose_level': 140,
+     'hypertension': 0, 'heart_disease': 1, 'smoking_history': 'No Info'},
+    {'age': 36, 'bmi': 23.5, 'hba1c_level': 5.0, 'blood_glucose_level': 155,
+     'hypertension': 0, 'heart_disease': 0, 'smoking_history': 'current'},
+    {'age': 67, 'bmi': 41.1, 'hba1c_level': 8.2, 'blood_glucose_level': 260,
+     'hypertension': 1, 'heart_disease': 1, 'smoking_history': 'former'},
+    {'age': 44, 'bmi': 19.3, 'hba1c_level': 6.5, 'blood_glucose_level': 200,
+     'hypertension': 1, 'heart_disease': 0, 'smoking_history': 'ever'},
+    {'age': 3, 'bmi': 16.0, 'hba1c_level': 4.0, 'blood_glucose_level': 90,
+     'hypertension': 0, 'heart_disease': 0, 'smoking_history': 'not current'},
+]
+
+HEALTH_RECORDS = [
+    {'age': 50, 'blood_pressure': '130/85', 'cholesterol': 220, 'heart_rate': 80},
+    {'age': 63, 'blood_pressure': '145/92', 'cholesterol': 233, 'heart_rate': 150, 'st_depression': 2.3},
+    {'age': 37, 'blood_pressure': '120/80', 'cholesterol': 250, 'heart_rate': 187, 'st_depression': 3.5},
+    {'age': 71, 'blood_pressure': '160/100', 'cholesterol': 302, 'heart_rate': 112, 'st_depression': 0.4},
+]
+
+@pytest.fixture(scope='module')
+def classification_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 5)) * [10, 20, 1, 50, 2] + [50, 130, 1, 240, 1]
+    logits = (X[:, 0] - 50) / 10 + (X[:, 1] - 130) / 20 - (X[:, 3] - 240) / 50
+    y = (logits + rng.normal(size=400) > 0).astype(int)
+    return X, y
+
+def test_flat_forest_matches_sklearn(classification_data):
+    X, y = classification_data
+    forest = RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0).fit(X, y)
+    flat = FlatForest.from_sklearn(forest)
+
+    np.testing.assert_allclose(flat.predict_proba(X), forest.predict_proba(X), rtol=0, atol=ATOL)
+    np.testing.assert_allclose(flat.predict_proba(X[:1]), forest.predict_proba(X[:1]), rtol=0, atol=ATOL)
+
+def test_flat_forest_round_trips_through_arrays(classification_data):
+    X, y = classification_data
+    forest = RandomForestClassifier(n_estimators=5, random_state=1).fit(X, y)
+    flat = FlatForest(**FlatForest.from_sklearn(forest).to_arrays())
+
+    np.testing.assert_allclose(flat.predict_proba(X), forest.predict_proba(X), rtol=0, atol=ATOL)
+
+def test_linear_scorer_matches_sklearn(classification_data):
+    X, y = classification_data
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression().fit(scaler.transform(X), y)
+    scorer = LinearRiskScorer(scaler, model)
+    reference = model.predict_proba(scaler.transform(X))[:, 1]
+
+    np.testing.assert_allclose(scorer.score(X), reference, rtol=0, atol=ATOL)
+    single = scorer.score(list(X[0]))
+    assert isinstance(single, float)
+    assert single == pytest.approx(reference[0], abs=ATOL)
+
+@pytest.fixture(scope='module')
+def diabetes_model():
+    import diabetes_model
+    return diabetes_model
+
+@pytest.fixture(scope='module')
+def risk_model():
+    import risk_model
+    return risk_model
+
+@pytest.mark.parametrize('engine', ['sklearn', 'flat'])
+def test_diabetes_single_row_matches_dataframe(diabetes_model, monkeypatch, engine):
+    monkeypatch.setattr(diabetes_model, 'INFERENCE_ENGINE', engine)
+    fast = [diabetes_model.predict_diabetes_risk(record) for record in DIABETES_RECORDS]
+    reference = [diabetes_model._predict_diabetes_risk_dataframe(record) for record in DIABETES_RECORDS]
+
+    np.testing.assert_allclose(fast, reference, rtol=0, atol=ATOL)
+
+def test_diabetes_batch_matches_single_row(diabetes_model):
+    batch = diabetes_model.predict_diabetes_risk_batch(DIABETES_RECORDS)
+    single = [diabetes_model.predict_diabetes_risk(record) for record in DIABETES_RECORDS]
+
+    np.testing.assert_allclose(batch, single, rtol=0, atol=ATOL)
+
+def test_heart_scorer_matches_sklearn(risk_model):
+    single = [risk_model.predict_heart_disease_risk(record) for record in HEALTH_RECORDS]
+    batch = risk_model.predict_heart_disease_risk_batch(HEALTH_RECORDS)
+    features = [risk_model._extract_features(record) for record in HEALTH_RECORDS]
+    reference = risk_model._sklearn_risk(features)
+
+    np.testing.assert_allclose(single, reference, rtol=0, atol=ATOL)
+    np.testing.assert_allclose(batch, reference, rtol=0, atol=ATOL)
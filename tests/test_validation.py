@@ -0,0 +1,108 @@
+"""
+Schema validation of single records and whole batches, and the data routes
+that store validated values.
+"""
+import numpy as np
+import pytest
+
+from utils import (DIABETES_SCHEMA, DIABETES_RECORD_FIELDS, DIABETES_RECORD_DEFAULTS, HEALTH_RECORD_FIELDS,
+                   HEALTH_RECORD_DEFAULTS, parse_int_parts, validate_columns, validate_record)
+
+HEALTH = {'age': 50, 'blood_pressure': '130/85', 'cholesterol': 220, 'heart_rate': 80,
+          'temperature': 36.8, 'weight': 80}
+DIABETES = {'gender': 'Male', 'age': 50, 'bmi': 30, 'hba1c_level': 6.5, 'blood_glucose_level': 160,
+            'hypertension': 1, 'heart_disease': 0, 'smoking_history': 'never'}
+BP_MESSAGE = "Invalid blood pressure format. Expected format: '120/80'"
+
+def test_parse_int_parts():
+    column = np.array(['120/80', '7/5', '120', '/80', '120/80/1', '12a/80', None, 120], dtype=object)
+    values, well_formed = parse_int_parts(column, 2, 10)
+
+    assert well_formed.tolist() == [True, True, False, False, False, False, False, False]
+    assert values[:2].tolist() == [[120, 80], [7, 5]]
+
+def test_overlong_blood_pressure_fails_only_its_row():
+    records = [dict(HEALTH) for _ in range(100)]
+    records[42]['blood_pressure'] = '1' * 20000
+
+    values, valid, errors = validate_columns(records, HEALTH_RECORD_FIELDS, defaults=HEALTH_RECORD_DEFAULTS)
+
+    assert errors == [(42, BP_MESSAGE)]
+    assert valid.sum() == 99
+    assert values.loc[0, 'systolic'] == 130
+    with pytest.raises(ValueError, match='blood pressure'):
+        validate_record({'blood_pressure': '0' * 11}, ['blood_pressure'])
+
+def test_non_string_blood_pressure_is_malformed():
+    records = [dict(HEALTH, blood_pressure=['1'] * 1000), dict(HEALTH, blood_pressure=120)]
+
+    _, valid, errors = validate_columns(records, HEALTH_RECORD_FIELDS, defaults=HEALTH_RECORD_DEFAULTS)
+
+    assert not valid.any()
+    assert [message for _, message in errors] == [BP_MESSAGE, BP_MESSAGE]
+
+def test_blank_strings_count_as_missing():
+    record = dict(HEALTH, temperature='', weight='  ')
+
+    values = validate_record(record, HEALTH_RECORD_FIELDS, defaults=HEALTH_RECORD_DEFAULTS)
+    columns, valid, _ = validate_columns([record], HEALTH_RECORD_FIELDS, defaults=HEALTH_RECORD_DEFAULTS)
+
+    assert values['temperature'] is None and values['weight'] is None
+    assert valid.all() and np.isnan(columns.loc[0, 'temperature'])
+    with pytest.raises(ValueError, match='Heart rate is required'):
+        validate_record(dict(HEALTH, heart_rate=' '), HEALTH_RECORD_FIELDS, defaults=HEALTH_RECORD_DEFAULTS)
+
+def test_float_strings_for_int_fields():
+    record = dict(DIABETES, hypertension='1.0', heart_disease='0.0')
+
+    values = validate_record(record, DIABETES_RECORD_FIELDS, DIABETES_SCHEMA, DIABETES_RECORD_DEFAULTS)
+    columns, valid, _ = validate_columns([record], DIABETES_RECORD_FIELDS, DIABETES_SCHEMA, DIABETES_RECORD_DEFAULTS)
+
+    assert (values['hypertension'], values['heart_disease']) == (1, 0)
+    assert valid.all() and columns.loc[0, 'hypertension'] == 1.0
+
+def test_text_fields():
+    records = [
+        dict(DIABETES, smoking_history=' former '),
+        {k: v for k, v in DIABETES.items() if k != 'smoking_history'},
+        dict(DIABETES, gender='x' * 11),
+        {k: v for k, v in DIABETES.items() if k != 'gender'},
+    ]
+
+    columns, valid, errors = validate_columns(records, DIABETES_RECORD_FIELDS, DIABETES_SCHEMA,
+                                              DIABETES_RECORD_DEFAULTS)
+
+    assert valid.tolist() == [True, False, False, True]
+    assert errors == [(1, "Smoking history is required"), (2, "Gender must be text of at most 10 characters")]
+    assert columns.loc[0, 'smoking_history'] == 'former'
+    assert columns.loc[3, 'gender'] is None
+
+def test_diabetes_routes_store_validated_values(client):
+    record = dict(DIABETES, hypertension='1.0', heart_disease='0.0')
+
+    assert client.post('/api/diabetes-data', json=record).status_code == 200
+    response = client.post('/api/diabetes-data/batch', json=[record, DIABETES])
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 2
+
+def test_diabetes_routes_require_smoking_history(client):
+    record = {k: v for k, v in DIABETES.items() if k != 'smoking_history'}
+
+    single = client.post('/api/diabetes-data', json=record)
+    batch = client.post('/api/diabetes-data/batch', json=[DIABETES, record])
+
+    assert single.status_code == 400
+    assert batch.status_code == 400
+    assert batch.get_json()['message'] == "Invalid record at index 1: Smoking history is required"
+
+def test_health_batch_rejects_overlong_blood_pressure(client):
+    response = client.post('/api/health-data/batch', json=[HEALTH, dict(HEALTH, blood_pressure='1' * 20000)])
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == f"Invalid record at index 1: {BP_MESSAGE}"
+
+def test_health_data_requires_model_features(client):
+    response = client.post('/api/health-data', json={k: v for k, v in HEALTH.items() if k != 'cholesterol'})
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == "Cholesterol is required"
@@ -1,28 +1,303 @@
 import logging
+import os
 from datetime import datetime
 import re
+from collections import namedtuple
+import numpy as np
+import pandas as pd
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging; LOG_LEVEL is shared with app.py, whichever module loads first applies it
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
+# Inclusive range for a validated metric. Values are converted with float()
+# first; int fields are then truncated, so '72' and 72.0 both give 72.
+FieldRange = namedtuple('FieldRange', ['label', 'cast', 'minimum', 'maximum'])
+# A free-text field, stripped and no longer than its String column
+FieldText = namedtuple('FieldText', ['label', 'max_length'])
+
+HEALTH_SCHEMA = {
+    'age': FieldRange('Age', float, 20, 100),
+    'systolic': FieldRange('Systolic blood pressure', int, 70, 200),
+    'diastolic': FieldRange('Diastolic blood pressure', int, 40, 130),
+    'heart_rate': FieldRange('Heart rate', int, 30, 220),
+    'temperature': FieldRange('Temperature', float, 35.0, 42.0),
+    'weight': FieldRange('Weight', float, 20.0, 300.0),
+    'cholesterol': FieldRange('Cholesterol', float, 100, 600),
+    'st_depression': FieldRange('ST depression', float, 0, 6)
+}
+
+DIABETES_SCHEMA = {
+    'age': FieldRange('Age', float, 0, 120),
+    'bmi': FieldRange('BMI', float, 10, 100),
+    'hba1c_level': FieldRange('HbA1c level', float, 3, 20),
+    'blood_glucose_level': FieldRange('Blood glucose level', float, 20, 600),
+    'hypertension': FieldRange('Hypertension', int, 0, 1),
+    'heart_disease': FieldRange('Heart disease', int, 0, 1),
+    'smoking_history': FieldText('Smoking history', 20),
+    'gender': FieldText('Gender', 10)
+}
+
+# Request keys holding several schema fields in one 'a/b' string
+SPLIT_FIELDS = {
+    'blood_pressure': ('systolic', 'diastolic')
+}
+SPLIT_MESSAGES = {
+    'blood_pressure': "Invalid blood pressure format. Expected format: '120/80'"
+}
+# Longest string accepted for a SPLIT_FIELDS key: the width of its String column
+SPLIT_MAX_LENGTHS = {
+    'blood_pressure': 10
+}
+
+# Fields checked before a reading is stored; the model modules validate
+# their own feature sets against the same schemas
+HEALTH_RECORD_FIELDS = ['blood_pressure', 'heart_rate', 'age', 'cholesterol', 'temperature', 'weight', 'st_depression']
+# st_depression defaults as in risk_model.FEATURE_DEFAULTS, so the stored value is the one scored
+HEALTH_RECORD_DEFAULTS = {'age': None, 'cholesterol': None, 'temperature': None, 'weight': None, 'st_depression': 0}
+DIABETES_RECORD_FIELDS = ['age', 'bmi', 'hba1c_level', 'blood_glucose_level', 'hypertension', 'heart_disease',
+                          'smoking_history', 'gender']
+DIABETES_RECORD_DEFAULTS = {'gender': None}
+
+def _range_message(spec):
+    return f"{spec.label} must be between {spec.minimum:g} and {spec.maximum:g}"
+
+def _text_message(spec):
+    return f"{spec.label} must be text of at most {spec.max_length} characters"
+
+def check_field(name, value, schema=HEALTH_SCHEMA):
+    """
+    Convert a single value for a schema field and check its range
+    Returns the converted value, raises ValueError if it is invalid
+    """
+    spec = schema[name]
+    if isinstance(spec, FieldText):
+        if not isinstance(value, str) or len(value.strip()) > spec.max_length:
+            raise ValueError(_text_message(spec))
+        return value.strip()
+    try:
+        converted = float(value)
+        if spec.cast is int:
+            converted = int(converted)
+    except (ValueError, TypeError, OverflowError):
+        raise ValueError(_range_message(spec))
+    if not (spec.minimum <= converted <= spec.maximum):
+        raise ValueError(_range_message(spec))
+    return converted
+
+def validate_record(data, fields, schema=HEALTH_SCHEMA, defaults=None):
+    """
+    Validate one request dict against the schema
+
+    Args:
+        data (dict): Request values
+        fields (list): Request keys to validate, in order; keys in SPLIT_FIELDS
+            expand into their parts (e.g. blood_pressure -> systolic, diastolic)
+        schema (dict): Field name -> FieldRange
+        defaults (dict): Values for keys that may be missing; a None default
+            leaves the field None and skips its check. Blank strings (e.g.
+            an empty optional form input) count as missing.
+
+    Returns:
+        dict: Converted value for every schema field
+
+    Raises:
+        ValueError: For the first missing or out-of-range field
+    """
+    defaults = defaults or {}
+    values = {}
+    for key in fields:
+        value = data.get(key)
+        if value is None or (value.__class__ is str and not value.strip()):
+            if key not in defaults:
+                raise ValueError(SPLIT_MESSAGES.get(key) or f"{schema[key].label} is required")
+            value = defaults[key]
+            if value is None:
+                for name in SPLIT_FIELDS.get(key, (key,)):
+                    values[name] = None
+                continue
+
+        if key in SPLIT_FIELDS:
+            text = str(value)
+            if len(text) > SPLIT_MAX_LENGTHS[key]:
+                raise ValueError(SPLIT_MESSAGES[key])
+            parts = text.split('/')
+            if len(parts) != len(SPLIT_FIELDS[key]) or not all(p.isascii() and p.isdigit() for p in parts):
+                raise ValueError(SPLIT_MESSAGES[key])
+            for name, part in zip(SPLIT_FIELDS[key], parts):
+                values[name] = check_field(name, part, schema)
+        else:
+            values[key] = check_field(key, value, schema)
+    return values
+
+def _gather(records, key):
+    """
+    One request key across all records as an object array (None where missing)
+    """
+    if isinstance(records, pd.DataFrame):
+        if key not in records:
+            return np.full(len(records), None, dtype=object)
+        return records[key].to_numpy(dtype=object)
+    return np.fromiter((record.get(key) for record in records), dtype=object, count=len(records))
+
+_is_blank = np.frompyfunc(lambda value: isinstance(value, str) and not value.strip(), 1, 1)
+
+def _missing(column):
+    """
+    Mask of None/NaN values and blank strings in an object array
+    """
+    missing = pd.isna(column)
+    if len(column) and column.dtype == object:
+        missing |= _is_blank(column).astype(bool)
+    return missing
+
+def _to_float(column):
+    """
+    Convert an object array to float64, with NaN for anything non-numeric
+    """
+    try:
+        return column.astype(np.float64)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return np.asarray(pd.to_numeric(column, errors='coerce'), dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([value if isinstance(value, (int, float)) else np.nan for value in column], dtype=np.float64)
+
+# Parsed parts are capped so oversized numbers fail the range check instead of overflowing
+_PART_CAP = 10 ** 12
+
+def parse_int_parts(column, count, max_length):
+    """
+    Parse an object array of strings of `count` whole numbers separated by
+    '/' (e.g. '120/80'), without range checks.
+    The strings are viewed as a byte matrix and digits are accumulated one
+    character position at a time, so the cost is a few array operations per
+    character rather than per row. Values that aren't strings of at most
+    max_length characters are malformed and left out of the matrix, so one
+    oversized value can't widen it for the whole batch.
+
+    Returns:
+        tuple: ((N, count) float64 values, boolean mask of well-formed rows)
+    """
+    n = len(column)
+    usable = np.fromiter((value.__class__ is str and len(value) <= max_length for value in column),
+                         dtype=bool, count=n)
+    if not usable.all():
+        column = np.where(usable, column, '')
+    try:
+        text = column.astype('S')
+    except UnicodeEncodeError:
+        # Non-ASCII strings can't be well-formed; blank them out
+        text = np.array([v if isinstance(v, str) and v.isascii() else '' for v in column], dtype='S')
+    chars = text.view(np.uint8).reshape(n, text.dtype.itemsize).astype(np.int64)
+
+    rows = np.arange(n)
+    values = np.zeros((n, count), dtype=np.int64)
+    current = np.zeros(n, dtype=np.int64)
+    digits = np.zeros(n, dtype=np.int64)
+    part = np.zeros(n, dtype=np.int64)
+    well_formed = usable.copy()
+    for j in range(chars.shape[1]):
+        char = chars[:, j]
+        is_digit = (char >= 48) & (char <= 57)
+        is_slash = char == 47
+        # Byte 0 is the padding after shorter strings
+        well_formed &= is_digit | is_slash | (char == 0)
+        well_formed &= ~(is_slash & (digits == 0))
+        current = np.where(is_digit, np.minimum(current * 10 + (char - 48), _PART_CAP), current)
+        digits += is_digit
+
+        ended = rows[is_slash]
+        values[ended, np.minimum(part[ended], count - 1)] = current[ended]
+        part += is_slash
+        current[ended] = 0
+        digits[ended] = 0
+
+    well_formed &= (part == count - 1) & (digits > 0)
+    values[rows, np.minimum(part, count - 1)] = current
+    return values.astype(np.float64), well_formed
+
+def validate_columns(records, fields, schema=HEALTH_SCHEMA, defaults=None):
+    """
+    Vectorized validate_record for a whole batch
+
+    Args:
+        records: List of request dicts or a DataFrame with one row per record
+        fields, schema, defaults: As for validate_record
+
+    Returns:
+        tuple: (values, valid, errors) where values is a DataFrame with one
+        column per schema field and one row per record (float64 for ranges,
+        NaN where a defaulted field is missing; stripped strings or None for
+        text fields), valid is a boolean mask of records that
+        passed, and errors lists (index, message) for the first failing field
+        of every other record
+    """
+    defaults = defaults or {}
+    n = len(records)
+    values = {}
+    valid = np.ones(n, dtype=bool)
+    messages = np.empty(n, dtype=object)
+
+    def fail(mask, message):
+        new = mask & valid
+        messages[new] = message
+        valid[new] = False
+
+    def check(name, converted, present):
+        spec = schema[name]
+        if spec.cast is int:
+            converted = np.trunc(converted)
+        in_range = (converted >= spec.minimum) & (converted <= spec.maximum)
+        fail(present & ~in_range, _range_message(spec))
+        values[name] = np.where(present, converted, np.nan)
+
+    def check_text(name, column, present):
+        spec = schema[name]
+        text = np.fromiter((value.strip() if value.__class__ is str else None for value in column),
+                           dtype=object, count=n)
+        fits = np.fromiter((value is not None and len(value) <= spec.max_length for value in text),
+                           dtype=bool, count=n)
+        fail(present & ~fits, _text_message(spec))
+        # An object Series, so pandas keeps None rather than inferring a string dtype with NaN
+        values[name] = pd.Series(np.where(present & fits, text, None), dtype=object)
+
+    for key in fields:
+        column = _gather(records, key)
+        present = ~_missing(column)
+        if key not in defaults:
+            fail(~present, SPLIT_MESSAGES.get(key) or f"{schema[key].label} is required")
+        elif defaults[key] is not None:
+            column[~present] = defaults[key]
+            present[:] = True
+
+        if key in SPLIT_FIELDS:
+            names = SPLIT_FIELDS[key]
+            parts, well_formed = parse_int_parts(column, len(names), SPLIT_MAX_LENGTHS[key])
+            fail(present & ~well_formed, SPLIT_MESSAGES[key])
+            for i, name in enumerate(names):
+                check(name, parts[:, i], present)
+        elif isinstance(schema[key], FieldText):
+            check_text(key, column, present)
+        else:
+            check(key, _to_float(column), present)
+
+    errors = [(int(i), messages[i]) for i in np.flatnonzero(~valid)]
+    return pd.DataFrame(values, index=range(n)), valid, errors
+
 def validate_blood_pressure(bp_string):
     """
     Validate blood pressure string format (e.g., '120/80')
     Returns tuple of (systolic, diastolic) if valid, None if invalid
     """
-    try:
-        if not bp_string or '/' not in bp_string:
-            return None
-        
-        systolic, diastolic = map(int, bp_string.split('/'))
-        
-        # Basic range validation
-        if 70 <= systolic <= 200 and 40 <= diastolic <= 130:
-            return (systolic, diastolic)
+    if not bp_string:
         return None
+    try:
+        values = validate_record({'blood_pressure': bp_string}, ['blood_pressure'])
     except ValueError:
         return None
+    return (values['systolic'], values['diastolic'])
 
 def validate_heart_rate(hr):
     """
@@ -30,11 +305,8 @@ def validate_heart_rate(hr):
     Returns heart rate if valid, None if invalid
     """
     try:
-        hr = int(hr)
-        if 30 <= hr <= 220:
-            return hr
-        return None
-    except (ValueError, TypeError):
+        return check_field('heart_rate', hr)
+    except ValueError:
         return None
 
 def validate_temperature(temp):
@@ -43,11 +315,8 @@ def validate_temperature(temp):
     Returns temperature if valid, None if invalid
     """
     try:
-        temp = float(temp)
-        if 35.0 <= temp <= 42.0:
-            return temp
-        return None
-    except (ValueError, TypeError):
+        return check_field('temperature', temp)
+    except ValueError:
         return None
 
 def validate_weight(weight):
@@ -56,11 +325,8 @@ def validate_weight(weight):
     Returns weight if valid, None if invalid
     """
     try:
-        weight = float(weight)
-        if 20.0 <= weight <= 300.0:
-            return weight
-        return None
-    except (ValueError, TypeError):
+        return check_field('weight', weight)
+    except ValueError:
         return None
 
 def validate_email(email):